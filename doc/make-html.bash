@@ -7,5 +7,5 @@ python3 -m pip uninstall -y shell-logger
 cd ..
 python3 -m pip install .
 cd "${SCRIPT_DIR}" || exit 1
-make html SPHINXOPTS="-W --keep-going"
+make html SPHINXOPTS="-W --keep-going -j auto"
 cd "${ORIG_DIR}" || exit 1
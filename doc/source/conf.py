@@ -5,10 +5,12 @@ For the full list of built-in configuration values, see the documentation:
 https://www.sphinx-doc.org/en/master/usage/configuration.html
 """
 
+import os
 import sys
 from pathlib import Path
 
-sys.path.append(str(Path.cwd().parent.parent.resolve() / "shell_logger"))
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "shell_logger"))
 
 # -- Project information -----------------------------------------------------
 
@@ -30,16 +32,22 @@ extensions = [
     "sphinx.ext.mathjax",
     "sphinx.ext.napoleon",
     "sphinx.ext.todo",
-    "sphinx.ext.viewcode",
     "sphinxarg.ext",
     "sphinx_autodoc_typehints",
     "sphinx_copybutton",
     "sphinx_rtd_theme",
-    "sphinxcontrib.programoutput",
 ]
+if os.environ.get("SHELLLOG_FAST_DOCS"):
+    extensions.remove("sphinx_autodoc_typehints")
 intersphinx_mapping = {"python": ("https://docs.python.org/3", None)}
 
-templates_path = ["_templates"]
+templates_path = []
+exclude_patterns = [
+    "_build",
+    "Thumbs.db",
+    ".DS_Store",
+    "**/.ipynb_checkpoints",
+]
 
 
 # -- Options for HTML output -------------------------------------------------
@@ -52,9 +60,16 @@ html_static_path = ["_static"]
 autodoc_default_options = {
     "show-inheritance": True,
     "members": True,
-    "undoc-members": True,
 }
+if os.environ.get("SHELLLOG_FULL_DOCS"):
+    autodoc_default_options["undoc-members"] = True
 autoclass_content = "both"
 autodoc_preserve_defaults = True
 autodoc_inherit_docstrings = False
 todo_include_todos = True
+
+# -- Type Hints Configuration ------------------------------------------------
+
+always_use_bars_union = True
+typehints_defaults = "comma"
+typehints_use_signature = False
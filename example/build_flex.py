@@ -7,57 +7,66 @@
 
 # SPDX-License-Identifier: BSD-3-Clause
 
+import sys
 from pathlib import Path
 
 from shell_logger import ShellLogger
 
-sl = ShellLogger(
-    "Build Flex",
-    log_dir=(Path.cwd() / f"log_{Path(__file__).stem}"),
-)
-sl.print(
-    "This example demonstrates cloning, configuring, and building the Flex "
-    "tool."
-)
+CWD = Path.cwd()
 FLEX_VERSION = "flex-2.5.39"
-sl.log(
-    "Clone the Flex repository.",
-    f"git clone --depth 1 --branch {FLEX_VERSION} "
-    f"https://github.com/westes/flex.git {FLEX_VERSION}",
-    live_stdout=True,
-    live_stderr=True,
-)
-sl.log(
-    "Run `autogen`.",
-    "./autogen.sh",
-    cwd=Path.cwd() / FLEX_VERSION,
-    live_stdout=True,
-    live_stderr=True,
-)
-measure = ["cpu", "memory", "disk"]
-sl.log(
-    "Configure flex.",
-    "./configure --prefix=$(dirname $(pwd))/flex",
-    cwd=Path.cwd() / FLEX_VERSION,
-    live_stdout=True,
-    live_stderr=True,
-    measure=measure,
-)
-sl.log(
-    "Build `libcompat.la`.",
-    "make libcompat.la",
-    cwd=Path.cwd() / f"{FLEX_VERSION}/lib",
-    live_stdout=True,
-    live_stderr=True,
-    measure=measure,
-)
-sl.log(
-    "Build & install flex.",
-    "make install-exec",
-    cwd=Path.cwd() / FLEX_VERSION,
-    live_stdout=True,
-    live_stderr=True,
-    measure=measure,
-)
-sl.finalize()
-print(f"Open {sl.html_file} to view the log.")
+FLEX_DIR = CWD / FLEX_VERSION
+FLEX_LIB_DIR = FLEX_DIR / "lib"
+LIVE = {"live_stdout": True, "live_stderr": True}
+MEASURE = ("cpu", "memory", "disk")
+LIVE_MEAS = {**LIVE, "measure": MEASURE}
+
+if __name__ == "__main__":
+    sl = ShellLogger(
+        "Build Flex",
+        log_dir=(CWD / f"log_{Path(__file__).stem}"),
+    )
+    sl.print(
+        "This example demonstrates cloning, configuring, and building the "
+        "Flex tool."
+    )
+    if not FLEX_DIR.exists():
+        sl.log_exec(
+            "Clone the Flex repository.",
+            [
+                "git",
+                "clone",
+                "--depth",
+                "1",
+                "--branch",
+                FLEX_VERSION,
+                "https://github.com/westes/flex.git",
+                FLEX_VERSION,
+            ],
+            **LIVE,
+        )
+    sl.log(
+        "Run `autogen`.",
+        "./autogen.sh",
+        cwd=FLEX_DIR,
+        **LIVE,
+    )
+    sl.log(
+        "Configure flex.",
+        "./configure --prefix=$(dirname $(pwd))/flex",
+        cwd=FLEX_DIR,
+        **LIVE_MEAS,
+    )
+    sl.log_exec(
+        "Build `libcompat.la`.",
+        ["make", "libcompat.la"],
+        cwd=FLEX_LIB_DIR,
+        **LIVE_MEAS,
+    )
+    sl.log_exec(
+        "Build & install flex.",
+        ["make", "install-exec"],
+        cwd=FLEX_DIR,
+        **LIVE_MEAS,
+    )
+    sl.finalize()
+    sys.stdout.write(f"Open {sl.html_file} to view the log.\n")
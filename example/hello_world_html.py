@@ -7,23 +7,35 @@
 
 # SPDX-License-Identifier: BSD-3-Clause
 
+import sys
 from pathlib import Path
 
 from shell_logger import ShellLogger
 
-sl = ShellLogger(
-    "Hello World HTML",
-    log_dir=(Path.cwd() / f"log_{Path(__file__).stem}"),
-)
-sl.print(
-    "This example demonstrates logging information solely to the HTML log "
-    "file."
-)
-sl.log("Greet everyone to make them feel welcome.", "echo 'Hello World'")
-sl.log(
-    "Tell everyone who you are, but from a different directory.",
-    "whoami",
-    cwd=Path.cwd().parent,
-)
-sl.finalize()
-print(f"Open {sl.html_file} to view the log.")
+CWD = Path.cwd()
+
+if __name__ == "__main__":
+    sl = ShellLogger(
+        "Hello World HTML",
+        log_dir=(CWD / f"log_{Path(__file__).stem}"),
+    )
+    sl.print(
+        "This example demonstrates logging information solely to the HTML log "
+        "file."
+    )
+    sl.log_batch(
+        [
+            (
+                "Greet everyone to make them feel welcome.",
+                "echo 'Hello World'",
+                {},
+            ),
+            (
+                "Tell everyone who you are, but from a different directory.",
+                "whoami",
+                {"cwd": CWD.parent},
+            ),
+        ]
+    )
+    sl.finalize()
+    sys.stdout.write(f"Open {sl.html_file} to view the log.\n")
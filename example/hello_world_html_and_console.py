@@ -7,30 +7,37 @@
 
 # SPDX-License-Identifier: BSD-3-Clause
 
+import sys
 from pathlib import Path
 
 from shell_logger import ShellLogger
 
-sl = ShellLogger(
-    "Hello World HTML and Console",
-    log_dir=(Path.cwd() / f"log_{Path(__file__).stem}"),
-)
-sl.print(
-    "This example demonstrates logging information both to the HTML log file "
-    "and to the console simultaneously."
-)
-sl.log(
-    "Greet everyone to make them feel welcome.",
-    "echo 'Hello World'",
-    live_stdout=True,
-    live_stderr=True,
-)
-sl.log(
-    "Tell everyone who you are, but from a different directory.",
-    "whoami",
-    cwd=Path.cwd().parent,
-    live_stdout=True,
-    live_stderr=True,
-)
-sl.finalize()
-print(f"Open {sl.html_file} to view the log.")
+CWD = Path.cwd()
+
+if __name__ == "__main__":
+    sl = ShellLogger(
+        "Hello World HTML and Console",
+        log_dir=(CWD / f"log_{Path(__file__).stem}"),
+    )
+    sl.print(
+        "This example demonstrates logging information both to the HTML log "
+        "file and to the console simultaneously."
+    )
+    sl.log_batch(
+        [
+            (
+                "Greet everyone to make them feel welcome.",
+                "echo 'Hello World'",
+                {},
+            ),
+            (
+                "Tell everyone who you are, but from a different directory.",
+                "whoami",
+                {"cwd": CWD.parent},
+            ),
+        ],
+        live_stdout=True,
+        live_stderr=True,
+    )
+    sl.finalize()
+    sys.stdout.write(f"Open {sl.html_file} to view the log.\n")
@@ -7,29 +7,38 @@
 
 # SPDX-License-Identifier: BSD-3-Clause
 
+import sys
 from pathlib import Path
 
 from shell_logger import ShellLogger
 
-sl = ShellLogger(
-    "Hello World HTML with Stats",
-    log_dir=(Path.cwd() / f"log_{Path(__file__).stem}"),
-)
-sl.print(
-    "This example demonstrates logging information solely to the HTML log "
-    "file, while collecting CPU, memory, and disk statistics at the same time."
-)
-measure = ["cpu", "memory", "disk"]
-sl.log(
-    "Greet everyone to make them feel welcome.",
-    "echo 'Hello World'",
-    measure=measure,
-)
-sl.log(
-    "Tell everyone who you are, but from a different directory.",
-    "whoami",
-    cwd=Path.cwd().parent,
-    measure=measure,
-)
-sl.finalize()
-print(f"Open {sl.html_file} to view the log.")
+CWD = Path.cwd()
+MEASURE = ("cpu", "memory", "disk")
+
+if __name__ == "__main__":
+    sl = ShellLogger(
+        "Hello World HTML with Stats",
+        log_dir=(CWD / f"log_{Path(__file__).stem}"),
+    )
+    sl.print(
+        "This example demonstrates logging information solely to the HTML log "
+        "file, while collecting CPU, memory, and disk statistics at the same "
+        "time."
+    )
+    sl.log_batch(
+        [
+            (
+                "Greet everyone to make them feel welcome.",
+                "echo 'Hello World'",
+                {"measure": []},
+            ),
+            (
+                "Tell everyone who you are, but from a different directory.",
+                "whoami",
+                {"cwd": CWD.parent},
+            ),
+        ],
+        measure=MEASURE,
+    )
+    sl.finalize()
+    sys.stdout.write(f"Open {sl.html_file} to view the log.\n")
@@ -24,8 +24,7 @@ class AbstractMethod(NotImplementedError):
         Indicate which method must be implemented for the class to be
         concrete.
         """
-        class_name = (
-            inspect.stack()[1].frame.f_locals["self"].__class__.__name__
-        )
-        method_name = inspect.stack()[1].function
+        caller = inspect.currentframe().f_back
+        class_name = caller.f_locals["self"].__class__.__name__
+        method_name = caller.f_code.co_name
         super().__init__(f"`{class_name}` must implement `{method_name}()`.")
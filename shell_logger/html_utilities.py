@@ -6,16 +6,30 @@
 
 # SPDX-License-Identifier: BSD-3-Clause
 
+import json
 import pkgutil
 import re
 import textwrap
 from collections.abc import Iterable, Mapping
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from types import SimpleNamespace
 from typing import Iterator, TextIO, Union
 
 
+# The character substitutions to turn a timestamp into an HTML ID.
+TIMESTAMP_ID_TRANSLATION = str.maketrans(" :/.", "_-_-")
+
+# The most data points to embed in the HTML for any one chart.
+MAX_CHART_POINTS = 1000
+
+# The volumes for which disk usage isn't worth plotting.
+UNINTERESTING_DISKS = frozenset(
+    ("/var", "/var/log", "/var/log/audit", "/boot", "/boot/efi")
+)
+
+
 def nested_simplenamespace_to_dict(
     namespace: Union[str, bytes, tuple, Mapping, Iterable, SimpleNamespace],
 ) -> Union[str, bytes, tuple, dict, list]:
@@ -58,10 +72,18 @@ def get_human_time(milliseconds: float) -> str:
         milliseconds:  The number of milliseconds since epoch.
 
     Returns:
-        A string representation of the date and time.
+        A string representation of the date and time, in the form
+        ``YYYY-MM-DD HH:MM:SS.ffffff``.
+
+    Note:
+        This is called for every point in every chart, so it uses
+        :func:`datetime.isoformat`, which needn't parse a format string
+        like :func:`datetime.strftime` does.
     """
     seconds = milliseconds / 1000.0
-    return datetime.fromtimestamp(seconds).strftime("%Y-%m-%d %H:%M:%S.%f")
+    return datetime.fromtimestamp(seconds).isoformat(
+        sep=" ", timespec="microseconds"
+    )
 
 
 def opening_html_text() -> str:
@@ -72,7 +94,7 @@ def opening_html_text() -> str:
         A string containing the first line of the HTML document through
         ``</head>``.
     """
-    return "<!DOCTYPE html><html>" + html_header()
+    return f"<!DOCTYPE html><html>{html_header()}"
 
 
 def closing_html_text() -> str:
@@ -85,13 +107,16 @@ def closing_html_text() -> str:
     return "</html>"
 
 
-def append_html(*args: Union[str, Iterator[str]], output: Path) -> None:
+def append_html(
+    *args: Union[str, Iterator[str]], output: Union[Path, TextIO]
+) -> None:
     """
     Append whatever is given to the ``output`` HTML file.
 
     Parameters:
         *args:  The argument(s) to write.
-        output:  The HTML file to append to.
+        output:  The HTML file to append to, either its path, or a file
+            object that's already open for writing.
     """
 
     def _append_html(
@@ -115,8 +140,11 @@ def append_html(*args: Union[str, Iterator[str]], output: Path) -> None:
                 message = f"Unsupported type: {type(arg)}"
                 raise TypeError(message)
 
-    with output.open("a") as output_file:
-        _append_html(output_file, *args)
+    if isinstance(output, Path):
+        with output.open("a") as output_file:
+            _append_html(output_file, *args)
+    else:
+        _append_html(output, *args)
 
 
 def fixed_width(text: str) -> str:
@@ -177,7 +205,7 @@ def parent_logger_card_html(
         :class:`ShellLogger`, and then the footer.
     """
     header, indent, footer = split_template(
-        parent_logger_template, "parent_body", name=name
+        load_template("parent_logger.html"), "parent_body", name=name
     )
     yield header
     for arg in flatten(args):
@@ -237,7 +265,10 @@ def child_logger_card_html(
         :func:`parent_logger_card_html`?
     """
     header, indent, footer = split_template(
-        child_logger_template, "child_body", name=name, duration=duration
+        load_template("child_logger.html"),
+        "child_body",
+        name=name,
+        duration=duration,
     )
     yield header
     for arg in args:
@@ -270,7 +301,7 @@ def command_card_html(
         and then the footer.
     """
     header, indent, footer = split_template(
-        command_template,
+        load_template("command.html"),
         "more_info",
         cmd_id=log["cmd_id"],
         command=fixed_width(log["cmd"]),
@@ -304,21 +335,15 @@ def html_message_card(log: dict) -> Iterator[str]:
         The header, followed by the contents of the message card, and
         then the footer.
     """
-    timestamp = (
-        log["timestamp"]
-        .replace(" ", "_")
-        .replace(":", "-")
-        .replace("/", "_")
-        .replace(".", "-")
-    )
+    timestamp = log["timestamp"].translate(TIMESTAMP_ID_TRANSLATION)
     header, indent, footer = split_template(
-        html_message_template,
+        load_template("html_message.html"),
         "message",
         title=log["msg_title"],
         timestamp=timestamp,
     )
-    text = html_encode(log["msg"])
-    text = "<pre>" + text.replace("\n", "<br>") + "</pre>"
+    text = html_encode(log["msg"]).replace("\n", "<br>")
+    text = f"<pre>{text}</pre>"
     yield header
     yield textwrap.indent(text, indent) + "\n"
     yield footer
@@ -339,9 +364,11 @@ def message_card(log: dict) -> Iterator[str]:
         The header, followed by the contents of the message card, and
         then the footer.
     """
-    header, indent, footer = split_template(message_template, "message")
-    text = html_encode(log["msg"])
-    text = "<pre>" + text.replace("\n", "<br>") + "</pre>"
+    header, indent, footer = split_template(
+        load_template("message.html"), "message"
+    )
+    text = html_encode(log["msg"]).replace("\n", "<br>")
+    text = f"<pre>{text}</pre>"
     yield header
     yield textwrap.indent(text, indent) + "\n"
     yield footer
@@ -365,7 +392,7 @@ def command_detail_list(cmd_id: str, *args: Iterator[str]) -> Iterator[str]:
         command that was run, and then the footer.
     """
     header, indent, footer = split_template(
-        command_detail_list_template, "details", cmd_id=cmd_id
+        load_template("command_detail_list.html"), "details", cmd_id=cmd_id
     )
     yield header
     for arg in args:
@@ -395,10 +422,10 @@ def command_detail(
         The HTML snippet for this command detail.
     """
     if hidden:
-        return hidden_command_detail_template.format(
+        return load_template("hidden_command_detail.html").format(
             cmd_id=cmd_id, name=name, value=value
         )
-    return command_detail_template.format(name=name, value=value)
+    return load_template("command_detail.html").format(name=name, value=value)
 
 
 def command_card(log: dict, stream_dir: Path) -> Iterator[str]:
@@ -420,9 +447,10 @@ def command_card(log: dict, stream_dir: Path) -> Iterator[str]:
         at a time.
     """
     cmd_id = log["cmd_id"]
-    stdout_path = stream_dir / f"{log['timestamp']}_{cmd_id}_stdout"
-    stderr_path = stream_dir / f"{log['timestamp']}_{cmd_id}_stderr"
-    trace_path = stream_dir / f"{log['timestamp']}_{cmd_id}_trace"
+    stem = f"{log['timestamp']}_{cmd_id}"
+    stdout_path = stream_dir / f"{stem}_stdout"
+    stderr_path = stream_dir / f"{stem}_stderr"
+    trace_path = stream_dir / f"{stem}_trace"
 
     # Collect all the details associated with the command that was run.
     info = [
@@ -458,17 +486,10 @@ def command_card(log: dict, stream_dir: Path) -> Iterator[str]:
                 data = log["stats"][stat]
                 diagnostics.append(time_series_plot(cmd_id, data, stat_title))
         if log["stats"].get("disk"):
-            uninteresting_disks = [
-                "/var",
-                "/var/log",
-                "/var/log/audit",
-                "/boot",
-                "/boot/efi",
-            ]
             disk_stats = {
                 x: y
                 for x, y in log["stats"]["disk"].items()
-                if x not in uninteresting_disks
+                if x not in UNINTERESTING_DISKS
             }
 
             # We sort because JSON deserialization may change
@@ -494,8 +515,7 @@ def time_series_plot(
     Returns:
         A HTML snippet for a plot of the given data.
     """
-    labels = [get_human_time(x) for x, _ in data_tuples]
-    values = [y for _, y in data_tuples]
+    labels, values = chart_series(data_tuples)
     identifier = f"{cmd_id}-{series_title.lower().replace(' ', '-')}-chart"
     return stat_chart_card(labels, values, series_title, identifier)
 
@@ -522,13 +542,39 @@ def disk_time_series_plot(
     Todo:
       * Should we combine this with :func:`time_series_plot`?
     """
-    labels = [get_human_time(x) for x, _ in data_tuples]
-    values = [y for _, y in data_tuples]
+    labels, values = chart_series(data_tuples)
     identifier = f"{cmd_id}-volume{volume_name.replace('/', '_')}-usage"
     stat_title = f"Used Space on {volume_name}"
     return stat_chart_card(labels, values, stat_title, identifier)
 
 
+def chart_series(
+    data_tuples: list[tuple[float, float]],
+) -> tuple[list[str], list[float]]:
+    """
+    Split time series data into the labels and values for a chart.
+
+    Parameters:
+        data_tuples:  A list of :math:`x` and :math:`y` locations, where
+            the :math:`x` values are timestamps in milliseconds.
+
+    Returns:
+        The human-readable times and the corresponding values, gathered
+        in a single pass over the data.
+
+    Note:
+        Long series are thinned out by taking every :math:`n`-th point,
+        such that no more than :data:`MAX_CHART_POINTS` are embedded in
+        the HTML.  The full series is still saved in the JSON log.
+    """
+    stride = -(-len(data_tuples) // MAX_CHART_POINTS)
+    labels, values = [], []
+    for x, y in data_tuples[:: max(stride, 1)]:
+        labels.append(get_human_time(x))
+        values.append(y)
+    return labels, values
+
+
 def stat_chart_card(
     labels: list[str], data: list[float], title: str, identifier: str
 ) -> Iterator[str]:
@@ -543,9 +589,16 @@ def stat_chart_card(
 
     Yields:
         A HTML snippet for the chart with all the details filled in.
+
+    Note:
+        The labels and data are serialized as compact JSON, rather than
+        relying on Python's ``repr`` happening to be valid JavaScript.
     """
-    yield stat_chart_template.format(
-        labels=labels, data=data, title=title, id=identifier
+    yield load_template("stat_chart.html").format(
+        labels=json.dumps(labels, separators=(",", ":")),
+        data=json.dumps(data, separators=(",", ":")),
+        title=title,
+        id=identifier,
     )
 
 
@@ -576,7 +629,9 @@ def output_block_card(
     """
     name = title.replace(" ", "_").lower()
     template = (
-        output_card_collapsed_template if collapsed else output_card_template
+        load_template("output_card_collapsed.html")
+        if collapsed
+        else load_template("output_card.html")
     )
     header, indent, footer = split_template(
         template, "output_block", name=name, title=title, cmd_id=cmd_id
@@ -606,7 +661,7 @@ def output_block(
         The HTML equivalent of each line of the output in turn.
     """
     if isinstance(output, Path):
-        with output.open() as f:
+        with output.open(encoding="utf-8", errors="ignore") as f:
             for string in output_block_html(f, name, cmd_id):
                 yield string
     if isinstance(output, str):
@@ -632,7 +687,7 @@ def diagnostics_card(cmd_id: str, *args: Iterator[str]) -> Iterator[str]:
         and then the footer.
     """
     header, indent, footer = split_template(
-        diagnostics_template, "diagnostics", cmd_id=cmd_id
+        load_template("diagnostics.html"), "diagnostics", cmd_id=cmd_id
     )
     yield header
     for arg in args:
@@ -666,11 +721,14 @@ def output_block_html(
     if isinstance(lines, str):
         lines = lines.split("\n")
     header, indent, footer = split_template(
-        output_block_template, "table_contents", name=name, cmd_id=cmd_id
+        load_template("output_block.html"),
+        "table_contents",
+        name=name,
+        cmd_id=cmd_id,
     )
     yield header
     for line_no, line in enumerate(lines):
-        yield textwrap.indent(output_line_html(line, line_no), indent)
+        yield output_line_html(line, line_no, indent=indent)
     yield footer
 
 
@@ -715,14 +773,34 @@ def split_template(
         The header, indent, and footer.
     """
     fmt = {k: v for k, v in kwargs.items() if k != split_at}
+    before, indent, after = _split_template(template, split_at)
+    return before.format(**fmt), indent, after.format(**fmt)
+
+
+@lru_cache(maxsize=None)
+def _split_template(template: str, split_at: str) -> tuple[str, str, str]:
+    """
+    Subdivide a HTML template, without filling in its keywords.
+
+    The same few templates are split for every card in the log, so the
+    result is cached, and only the keyword replacement is done each
+    time in :func:`split_template`.
+
+    Parameters:
+        template:  A templated HTML snippet.
+        split_at:  A substring used to split the ``template`` into
+            before and after chunks.
+
+    Returns:
+        The unformatted header, the indent, and the unformatted footer.
+    """
     pattern = re.compile(
         f"(.*\\n)(\\s*)\\{{{split_at}\\}}\\n(.*)", flags=re.DOTALL
     )
-    before, indent, after = pattern.search(template).groups()
-    return before.format(**fmt), indent, after.format(**fmt)
+    return pattern.search(template).groups()
 
 
-def output_line_html(line: str, line_no: int) -> str:
+def output_line_html(line: str, line_no: int, *, indent: str = "") -> str:
     """
     Generate the HTML for a line of output.
 
@@ -733,12 +811,15 @@ def output_line_html(line: str, line_no: int) -> str:
     Parameters:
         line:  A line of output.
         line_no:  The corresponding line number.
+        indent:  The indentation to apply to the HTML snippet.
 
     Returns:
         The corresponding HTML snippet.
     """
     encoded_line = html_encode(line).rstrip()
-    return output_line_template.format(line=encoded_line, line_no=line_no)
+    return indented_template("output_line.html", indent).format(
+        line=encoded_line, line_no=line_no
+    )
 
 
 def html_encode(text: str) -> str:
@@ -769,10 +850,12 @@ def sgr_to_html(text: str) -> str:
     Returns:
         The same text, with the escape codes translated to HTML/CSS.
     """
+    parts = []
+    position = 0
     span_count = 0
-    while text.find("\x1b[") >= 0:
-        start = text.find("\x1b[")
-        finish = text.find("m", start)
+    start = text.find("\x1b[")
+    while start >= 0 and (finish := text.find("m", start)) >= 0:
+        parts.append(text[position:start])
         sgrs = text[start + 2 : finish].split(";")
         span_string = ""
         if len(sgrs) == 0:
@@ -796,8 +879,11 @@ def sgr_to_html(text: str) -> str:
                     span_count += 1
                     span_string += sgr_4bit_color_and_style_to_html(sgrs[0])
                     sgrs = sgrs[1:]
-        text = text[:start] + span_string + text[finish + 1 :]
-    return text
+        parts.append(span_string)
+        position = finish + 1
+        start = text.find("\x1b[", position)
+    parts.append(text[position:])
+    return "".join(parts)
 
 
 def sgr_4bit_color_and_style_to_html(sgr: str) -> str:
@@ -920,33 +1006,46 @@ def sgr_24bit_color_to_html(sgr_params: list[str]) -> str:
     return "<span>"
 
 
+@lru_cache(maxsize=1)
 def html_header() -> str:
     """
     Get the HTML header, complete with embedded styles and scripts.
 
     Returns:
         A string with the ``<head>...</head>`` contents.
-    """
-    return (
-        "<head>"
-        + embed_style("bootstrap.min.css")
-        + embed_style("Chart.min.css")
-        + embed_style("top_level_style_adjustments.css")
-        + embed_style("parent_logger_style.css")
-        + embed_style("child_logger_style.css")
-        + embed_style("command_style.css")
-        + embed_style("message_style.css")
-        + embed_style("detail_list_style.css")
-        + embed_style("code_block_style.css")
-        + embed_style("output_style.css")
-        + embed_style("diagnostics_style.css")
-        + embed_style("search_controls.css")
-        + embed_script("jquery.slim.min.js")
-        + embed_script("bootstrap.bundle.min.js")
-        + embed_script("Chart.bundle.min.js")
-        + embed_script("search_output.js")
-        + embed_html("search_icon.svg")
-        + "</head>"
+
+    Note:
+        The header is assembled from the packaged resources only once
+        per process, and then reused for every subsequent HTML file.
+    """
+    styles = [
+        "bootstrap.min.css",
+        "Chart.min.css",
+        "top_level_style_adjustments.css",
+        "parent_logger_style.css",
+        "child_logger_style.css",
+        "command_style.css",
+        "message_style.css",
+        "detail_list_style.css",
+        "code_block_style.css",
+        "output_style.css",
+        "diagnostics_style.css",
+        "search_controls.css",
+    ]
+    scripts = [
+        "jquery.slim.min.js",
+        "bootstrap.bundle.min.js",
+        "Chart.bundle.min.js",
+        "search_output.js",
+    ]
+    return "".join(
+        [
+            "<head>",
+            *(embed_style(style) for style in styles),
+            *(embed_script(script) for script in scripts),
+            embed_html("search_icon.svg"),
+            "</head>",
+        ]
     )
 
 
@@ -967,11 +1066,8 @@ def embed_style(resource: str) -> str:
       * Should we combine this with :func:`embed_script` and
         :func:`embed_html`?
     """
-    return (
-        "<style>\n"
-        + pkgutil.get_data(__name__, f"resources/{resource}").decode()
-        + "\n</style>\n"
-    )
+    content = pkgutil.get_data(__name__, f"resources/{resource}").decode()
+    return f"<style>\n{content}\n</style>\n"
 
 
 def embed_script(resource: str) -> str:
@@ -987,11 +1083,8 @@ def embed_script(resource: str) -> str:
     Returns:
         A string containing the ``<script>...</script>`` block.
     """
-    return (
-        "<script>\n"
-        + pkgutil.get_data(__name__, f"resources/{resource}").decode()
-        + "\n</script>\n"
-    )
+    content = pkgutil.get_data(__name__, f"resources/{resource}").decode()
+    return f"<script>\n{content}\n</script>\n"
 
 
 def embed_html(resource: str) -> str:
@@ -1014,6 +1107,7 @@ def embed_html(resource: str) -> str:
     return pkgutil.get_data(__name__, f"resources/{resource}").decode()
 
 
+@lru_cache(maxsize=None)
 def load_template(template: str) -> str:
     """
     Load a template HTML file.
@@ -1024,6 +1118,10 @@ def load_template(template: str) -> str:
     Returns:
         A string containing the contents of the file.
 
+    Note:
+        Each template is only read from the package the first time it's
+        needed, and then cached for subsequent use.
+
     Todo:
       * Should we combine this with :func:`embed_html`?
     """
@@ -1031,17 +1129,59 @@ def load_template(template: str) -> str:
     return pkgutil.get_data(__name__, template_file).decode()
 
 
-command_detail_list_template = load_template("command_detail_list.html")
-command_detail_template = load_template("command_detail.html")
-hidden_command_detail_template = load_template("hidden_command_detail.html")
-stat_chart_template = load_template("stat_chart.html")
-diagnostics_template = load_template("diagnostics.html")
-output_card_template = load_template("output_card.html")
-output_card_collapsed_template = load_template("output_card_collapsed.html")
-output_block_template = load_template("output_block.html")
-output_line_template = load_template("output_line.html")
-message_template = load_template("message.html")
-html_message_template = load_template("html_message.html")
-command_template = load_template("command.html")
-child_logger_template = load_template("child_logger.html")
-parent_logger_template = load_template("parent_logger.html")
+@lru_cache(maxsize=None)
+def indented_template(template: str, indent: str) -> str:
+    """
+    Load a template HTML file, and indent it.
+
+    Indenting the template once, rather than indenting each snippet
+    generated from it, avoids the cost of :func:`textwrap.indent` for
+    every line of output.
+
+    Parameters:
+        template:  The file name to load.
+        indent:  The indentation to prepend to each line.
+
+    Returns:
+        A string containing the indented contents of the file.
+    """
+    return textwrap.indent(load_template(template), indent)
+
+
+# The templates used to be loaded eagerly into these module attributes;
+# they're now loaded lazily, on first access.
+_TEMPLATES = {
+    "command_detail_list_template": "command_detail_list.html",
+    "command_detail_template": "command_detail.html",
+    "hidden_command_detail_template": "hidden_command_detail.html",
+    "stat_chart_template": "stat_chart.html",
+    "diagnostics_template": "diagnostics.html",
+    "output_card_template": "output_card.html",
+    "output_card_collapsed_template": "output_card_collapsed.html",
+    "output_block_template": "output_block.html",
+    "output_line_template": "output_line.html",
+    "message_template": "message.html",
+    "html_message_template": "html_message.html",
+    "command_template": "command.html",
+    "child_logger_template": "child_logger.html",
+    "parent_logger_template": "parent_logger.html",
+}
+
+
+def __getattr__(name: str) -> str:
+    """
+    Lazily load a template accessed as a module attribute.
+
+    Parameters:
+        name:  The name of the attribute, e.g., ``command_template``.
+
+    Returns:
+        The contents of the corresponding template file.
+
+    Raises:
+        AttributeError:  If there is no such template.
+    """
+    if name in _TEMPLATES:
+        return load_template(_TEMPLATES[name])
+    message = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(message)
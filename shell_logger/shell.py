@@ -8,21 +8,115 @@
 
 from __future__ import annotations
 
-import _thread
+import codecs
 import fcntl
 import os
+import selectors
+import shlex
 import subprocess
 import sys
-from io import StringIO
+from contextlib import contextmanager, suppress
+from io import BytesIO, FileIO
 from pathlib import Path
-from threading import Thread
-from time import time
+from time import monotonic_ns, time
 from types import SimpleNamespace
-from typing import IO, Optional, TextIO
+from typing import IO, Iterator, Optional, Sequence
 
 
 END_OF_READ = 4
 
+# What to send the shell after each command to save its return code, and
+# to mark the end of its `stdout` and `stderr`.  The return code is sent
+# along with the end of `stderr`, between two end-of-transmission
+# characters, to save a round trip to the shell to ask for it.
+SAVE_RETURN_CODE = b"RET_CODE=$?\n"
+END_OUTPUT = (
+    b"printf '\\4'\n",
+    b"printf '\\4%s\\4' \"$RET_CODE\" 1>&2\n",
+)
+
+# How large to make the pipes carrying the shell's output, if possible.
+PIPE_SIZE = 2**20  # 1 MB
+
+# How much of a command's output to read at once.
+READ_SIZE = 2**18  # 256 KB
+
+# How much of a command's output to buffer before writing it to disk.
+STREAM_FILE_BUFFER_SIZE = 2**16  # 64 KB
+
+
+def end_of_output(
+    pending: bytes, chunk: memoryview, *, with_return_code: bool
+) -> tuple[bytes, bytes, Optional[bytes]]:
+    """
+    Find the end of a command's output from the underlying shell.
+
+    Parameters:
+        pending:  Anything held back from the previous read, as it may
+            have been the start of the end-of-output marker.
+        chunk:  What was just read from the shell's ``stdout`` or
+            ``stderr``.
+        with_return_code:  Whether the end of the stream is marked by
+            the return code between two end-of-transmission characters,
+            as for ``stderr``, rather than by a single one.
+
+    Returns:
+        The command's output that's ready to be written, anything to
+        hold back until the next read, and, if the stream ended, the
+        return code (which is empty for ``stdout``), or else ``None``.
+
+    Raises:
+        EOFError:  If the underlying shell closed the stream.
+
+    Note:
+        The marker at the end of ``stderr`` may be split across reads,
+        e.g., if the pipe was already full of output when the command
+        finished, so a trailing end-of-transmission character, and any
+        digits after it, are held back until it's clear whether they're
+        the command's output or the start of the marker.
+    """
+    if not chunk:
+        message = "The underlying shell closed unexpectedly."
+        raise EOFError(message)
+    data = pending + chunk
+    if not with_return_code:
+        if data[-1] == END_OF_READ:
+            return data[:-1], b"", b""
+        return data, b"", None
+    end_of_read = bytes([END_OF_READ])
+    head, found, tail = data.rpartition(end_of_read)
+    if found and not tail:
+        output, found, return_code = head.rpartition(end_of_read)
+        if found and return_code.isdigit():
+            return output, b"", return_code
+        return head, end_of_read, None
+    if found and tail.isdigit():
+        return head, end_of_read + tail, None
+    return data, b"", None
+
+
+@contextmanager
+def stopwatch() -> Iterator[SimpleNamespace]:
+    """
+    Time whatever runs within the context.
+
+    The start and finish times are recorded with the system clock, but
+    the duration is measured with the monotonic one, which can't jump
+    while the command runs.
+
+    Yields:
+        A namespace that, once the context exits, holds the ``start``
+        and ``finish`` times, in milliseconds since the epoch, and the
+        ``wall`` time, in milliseconds.
+    """
+    milliseconds_per_second = 10**3
+    nanoseconds_per_millisecond = 10**6
+    timing = SimpleNamespace(start=round(time() * milliseconds_per_second))
+    timer = monotonic_ns()
+    yield timing
+    timing.wall = (monotonic_ns() - timer) // nanoseconds_per_millisecond
+    timing.finish = round(time() * milliseconds_per_second)
+
 
 class Shell:
     """
@@ -101,26 +195,44 @@ class Shell:
         os.set_inheritable(self.aux_stdout_wfd, False)
         os.set_inheritable(self.aux_stderr_wfd, False)
 
+        # Where supported (Linux), widen the pipes carrying the shell's
+        # output, such that chatty commands block less often on a full
+        # pipe, and each read drains more at once.
+        if hasattr(fcntl, "F_SETPIPE_SZ"):
+            for output in [
+                self.shell_subprocess.stdout,
+                self.shell_subprocess.stderr,
+            ]:
+                with suppress(OSError):
+                    fcntl.fcntl(output, fcntl.F_SETPIPE_SZ, PIPE_SIZE)
+
         # Start the shell in the given directory.
         if pwd is None:
             pwd = Path.cwd()
         self.cd(pwd)
 
     def __del__(self) -> None:
-        """Close all the open file descriptors."""
-        for fd in [
-            self.aux_stdin_rfd,
-            self.aux_stdin_wfd,
-            self.aux_stdout_rfd,
-            self.aux_stdout_wfd,
-            self.aux_stderr_rfd,
-            self.aux_stderr_wfd,
+        """
+        Close all the open file descriptors.
+
+        Note:
+            If :func:`__init__` failed partway through, some of the file
+            descriptors may never have been created, and any that were
+            closed early are set to ``None``, so only those still open
+            are closed.
+        """
+        for name in [
+            "aux_stdin_rfd",
+            "aux_stdin_wfd",
+            "aux_stdout_rfd",
+            "aux_stdout_wfd",
+            "aux_stderr_rfd",
+            "aux_stderr_wfd",
         ]:
-            try:
-                os.close(fd)
-            except OSError as e:
-                if "Bad file descriptor" not in e.strerror:
-                    raise
+            fd = getattr(self, name, None)
+            if fd is not None:
+                with suppress(OSError):
+                    os.close(fd)
 
     def __eq__(self, other: Shell) -> bool:
         """
@@ -170,56 +282,51 @@ class Shell:
             The command run, along with its return code, ``stdout``,
             ``stderr``, start/stop time, and duration.
         """
-        milliseconds_per_second = 10**3
-        start = round(time() * milliseconds_per_second)
-
-        # Wrap the `command` in {braces} to support newlines and
-        # heredocs to tell the shell "this is one giant statement".
-        # Then run the command.
-        if kwargs.get("devnull_stdin"):
-            os.write(
-                self.aux_stdin_wfd, f"{{\n{command}\n}} </dev/null\n".encode()
+        with stopwatch() as timing:
+            # Wrap the `command` in {braces} to support newlines and
+            # heredocs to tell the shell "this is one giant statement".
+            # Then run the command, set the `RET_CODE` environment
+            # variable, such that we can access it later, and, because
+            # these writes are non-blocking, tell the shell that the
+            # writes are complete.  Hand it all to the shell in a single
+            # vectored write.
+            redirect = " </dev/null" if kwargs.get("devnull_stdin") else ""
+            os.writev(
+                self.aux_stdin_wfd,
+                [
+                    f"{{\n{command}\n}}{redirect}\n".encode(),
+                    SAVE_RETURN_CODE,
+                    *END_OUTPUT,
+                ],
             )
-        else:
-            os.write(self.aux_stdin_wfd, f"{{\n{command}\n}}\n".encode())
-
-        # Set the `RET_CODE` environment variable, such that we can
-        # access it later.
-        os.write(self.aux_stdin_wfd, "RET_CODE=$?\n".encode())
-
-        # Because these writes are non-blocking, tell the shell that the
-        # writes are complete.
-        os.write(self.aux_stdin_wfd, "printf '\\4'\n".encode())
-        os.write(self.aux_stdin_wfd, "printf '\\4' 1>&2\n".encode())
 
-        # Tee the output to multiple sinks (files, strings,
-        # `stdout`/`stderr`).
-        try:
-            output = self.tee(
-                self.shell_subprocess.stdout,
-                self.shell_subprocess.stderr,
-                **kwargs,
-            )
+            # Tee the output to multiple sinks (files, strings,
+            # `stdout`/`stderr`).
+            try:
+                output = self.tee(
+                    self.shell_subprocess.stdout,
+                    self.shell_subprocess.stderr,
+                    **kwargs,
+                )
 
-        # Note:  If something goes wrong in `tee()`, the only way to reliably
-        # propagate an exception from a thread that's spawned is to raise a
-        # KeyboardInterrupt.
-        except KeyboardInterrupt:
-            os.close(self.aux_stdin_wfd)
-            message = (
-                f"There was a problem running the command `{command}`.  "
-                "This is a fatal error and we cannot continue.  Ensure that "
-                "the syntax of the command is correct."
-            )
-            raise RuntimeError(message) from None
-        finish = round(time() * milliseconds_per_second)
+            # Note:  If something goes wrong in the shell, such as a
+            # syntax error, it exits, and `tee()` hits the end of its
+            # output.
+            except EOFError:
+                os.close(self.aux_stdin_wfd)
+                self.aux_stdin_wfd = None
+                message = (
+                    f"There was a problem running the command `{command}`.  "
+                    "This is a fatal error and we cannot continue.  Ensure "
+                    "that the syntax of the command is correct."
+                )
+                raise RuntimeError(message) from None
 
         # Pull the return code and return the results.  Note that if the
         # command executed spawns a sub-shell, you won't really have a
         # return code.
-        aux_out, _ = self.auxiliary_command(posix="echo $RET_CODE")
         try:
-            return_code = int(aux_out)
+            return_code = int(output.return_code)
         except ValueError:
             return_code = "N/A"
         return SimpleNamespace(
@@ -227,13 +334,111 @@ class Shell:
             args=command,
             stdout=output.stdout_str,
             stderr=output.stderr_str,
-            start=start,
-            finish=finish,
-            wall=finish - start,
+            **timing.__dict__,
+        )
+
+    def execute(self, argv: Sequence[str], **kwargs) -> SimpleNamespace:
+        """
+        Run a command directly, bypassing the underlying shell.
+
+        Spawn the given program as a subprocess of its own, rather than
+        writing it to the :class:`Shell` class' shell subprocess'
+        ``stdin``, and pull the ``stdout`` and ``stderr``.
+
+        Parameters:
+            argv:  The program to run, followed by its arguments.
+            **kwargs:  Any additional arguments to pass to
+                :func:`stream`.  If ``cwd`` is given, the program will
+                be run in that directory.
+
+        Returns:
+            The command run, along with its return code, ``stdout``,
+            ``stderr``, start/stop time, and duration.
+        """
+        with stopwatch() as timing:
+            try:
+                process = subprocess.Popen(
+                    argv,
+                    cwd=kwargs.get("cwd"),
+                    stdin=(
+                        subprocess.DEVNULL
+                        if kwargs.get("devnull_stdin")
+                        else None
+                    ),
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                )
+
+            # If the program can't be run, report it like the shell
+            # would, rather than losing the command from the log.
+            except (FileNotFoundError, PermissionError) as error:
+                return_code = (
+                    126 if isinstance(error, PermissionError) else 127
+                )
+                output = self.write_error(
+                    f"{error.filename}: {error.strerror}\n", **kwargs
+                )
+            else:
+                with process:
+                    output = self.stream(
+                        process.stdout, process.stderr, **kwargs
+                    )
+                    return_code = process.wait()
+        return SimpleNamespace(
+            returncode=return_code,
+            args=shlex.join(argv),
+            stdout=output.stdout_str,
+            stderr=output.stderr_str,
+            **timing.__dict__,
         )
 
     @staticmethod
-    def tee(  # noqa: C901
+    def stream(
+        stdout: IO[bytes], stderr: IO[bytes], **kwargs
+    ) -> SimpleNamespace:
+        """
+        Write output/error streams to multiple files until they close.
+
+        Like :func:`tee`, but for the pipes of a subprocess that exits
+        when it's done, rather than the persistent shell subprocess.
+
+        Parameters:
+            stdout:  The ``stdout`` file object to be split.
+            stderr:  The ``stderr`` file object to be split.
+            **kwargs:  Additional arguments.
+
+        Returns:
+            The ``stdout`` and ``stderr`` as strings.
+        """
+        return Shell.copy_output(stdout, stderr, from_shell=False, **kwargs)
+
+    @staticmethod
+    def write_error(message: str, **kwargs) -> SimpleNamespace:
+        """
+        Write an error message in place of a command's output.
+
+        Parameters:
+            message:  The error message to write to ``stderr``.
+            **kwargs:  Additional arguments, as for :func:`stream`.
+
+        Returns:
+            The (empty) ``stdout`` and the ``stderr`` as strings.
+        """
+        stdout_path = kwargs.get("stdout_path", Path(os.devnull))
+        stderr_path = kwargs.get("stderr_path", Path(os.devnull))
+        out = stdout_path.open("ab")
+        err = stderr_path.open("ab")
+        with out, err:
+            err.write(message.encode())
+        if not kwargs.get("quiet_stderr"):
+            sys.stderr.write(message)
+        return SimpleNamespace(
+            stdout_str="" if kwargs.get("stdout_str") else None,
+            stderr_str=message if kwargs.get("stderr_str") else None,
+        )
+
+    @staticmethod
+    def tee(
         stdout: Optional[IO[bytes]], stderr: Optional[IO[bytes]], **kwargs
     ) -> SimpleNamespace:
         """
@@ -248,75 +453,112 @@ class Shell:
             **kwargs:  Additional arguments.
 
         Returns:
-            The ``stdout`` and ``stderr`` as strings.
+            The ``stdout`` and ``stderr`` as strings, along with the
+            return code that followed the end of ``stderr``.
 
         Todo:
           * Replace ``**kwargs`` with function arguments.
         """
+        return Shell.copy_output(stdout, stderr, from_shell=True, **kwargs)
+
+    @staticmethod
+    def copy_output(
+        stdout: IO[bytes], stderr: IO[bytes], *, from_shell: bool, **kwargs
+    ) -> SimpleNamespace:
+        """
+        Copy output/error streams to multiple files.
+
+        Both streams are multiplexed in a single thread, and whatever
+        is available on either is read into that stream's reusable
+        buffer and written to its outputs.  Only the console needs the
+        output decoded, which is done incrementally, such that
+        characters split across reads aren't lost.
+
+        Parameters:
+            stdout:  The ``stdout`` file object to be split.
+            stderr:  The ``stderr`` file object to be split.
+            from_shell:  Whether the streams come from the underlying
+                shell, in which case the output ends when the
+                end-of-transmission character is sent, rather than when
+                the streams are closed.
+            **kwargs:  Additional arguments.
+
+        Returns:
+            The ``stdout`` and ``stderr`` as strings, along with the
+            return code that followed the end of ``stderr``, if the
+            streams came from the underlying shell.
+
+        Raises:
+            EOFError:  If the underlying shell closes its output.
+        """
         sys_stdout = None if kwargs.get("quiet_stdout") else sys.stdout
         sys_stderr = None if kwargs.get("quiet_stderr") else sys.stderr
-        stdout_io = StringIO() if kwargs.get("stdout_str") else None
-        stderr_io = StringIO() if kwargs.get("stderr_str") else None
-        stdout_path = kwargs.get("stdout_path", Path(os.devnull)).open("a")
-        stderr_path = kwargs.get("stderr_path", Path(os.devnull)).open("a")
-        stdout_tee = [sys_stdout, stdout_io, stdout_path]
-        stderr_tee = [sys_stderr, stderr_io, stderr_path]
-
-        def write(input_file: TextIO, output_files: list[TextIO]) -> None:
-            """
-            Write an input to multiple outputs.
-
-            Take the data from an input file object and write it to
-            multiple output file objects.
-
-            Parameters:
-                input_file:  The file object from which to read.
-                output_files:  A list of file objects to write to.
-            """
-            # Read chunks from the input file.
-            chunk_size = 4096  # 4 KB
-            chunk = os.read(input_file.fileno(), chunk_size)
-            while chunk and chunk[-1] != END_OF_READ:
-                for output_file in output_files:
-                    if output_file is not None:
-                        output_file.write(chunk.decode(errors="ignore"))
-                chunk = os.read(input_file.fileno(), chunk_size)
-
-            # If something goes wrong in the `tee()`, the only way to
-            # reliably propagate an exception from a thread that's
-            # spawned is to raise a KeyboardInterrupt.
-            if not chunk:
-                _thread.interrupt_main()
-
-            # Remove the end-of-transmission character, and write the
-            # last chunk.
-            chunk = chunk[:-1]
-            for output_file in output_files:
-                if output_file is not None:
-                    output_file.write(chunk.decode(errors="ignore"))
-
-        # Spawn threads to write to `stdout` and `stderr`.
-        threads = [
-            Thread(target=write, args=(stdout, stdout_tee)),
-            Thread(target=write, args=(stderr, stderr_tee)),
-        ]
-        for thread in threads:
-            thread.daemon = True
-            thread.start()
-        for thread in threads:
-            thread.join()
-        stdout_str = stdout_io.getvalue() if stdout_io is not None else None
-        stderr_str = stderr_io.getvalue() if stderr_io is not None else None
-
-        # Close any open file descriptors and return the `stdout` and
-        # `stderr`.
-        for file in stdout_tee + stderr_tee:
-            if (
-                file not in [None, sys.stdout, sys.stderr, sys.stdin]
-                and not file.closed
-            ):
-                file.close()
-        return SimpleNamespace(stdout_str=stdout_str, stderr_str=stderr_str)
+        stdout_io = BytesIO() if kwargs.get("stdout_str") else None
+        stderr_io = BytesIO() if kwargs.get("stderr_str") else None
+        return_code = b""
+        stdout_path = kwargs.get("stdout_path", Path(os.devnull))
+        stderr_path = kwargs.get("stderr_path", Path(os.devnull))
+        out = stdout_path.open("ab", buffering=STREAM_FILE_BUFFER_SIZE)
+        err = stderr_path.open("ab", buffering=STREAM_FILE_BUFFER_SIZE)
+
+        # Give each stream a single reusable buffer to read into, rather
+        # than allocating a new one for each read.
+        selector = selectors.DefaultSelector()
+        for input_file, console, output_files in [
+            (stdout, sys_stdout, [stdout_io, out]),
+            (stderr, sys_stderr, [stderr_io, err]),
+        ]:
+            selector.register(
+                input_file,
+                selectors.EVENT_READ,
+                (
+                    FileIO(input_file.fileno(), closefd=False),
+                    memoryview(bytearray(READ_SIZE)),
+                    codecs.getincrementaldecoder("utf-8")("ignore"),
+                    console,
+                    [f for f in output_files if f is not None],
+                ),
+            )
+
+        # Read whatever is available on either stream, and write it to
+        # the stream's outputs, until both streams are finished.
+        pending = {key.fd: b"" for key in selector.get_map().values()}
+        with selector, out, err:
+            while selector.get_map():
+                for key, _ in selector.select():
+                    raw, read_buffer, decoder, console, output_files = key.data
+                    chunk = read_buffer[: raw.readinto(read_buffer)]
+                    if from_shell:
+                        chunk, pending[key.fd], code = end_of_output(
+                            pending[key.fd],
+                            chunk,
+                            with_return_code=key.fileobj is stderr,
+                        )
+                        done = code is not None
+                        return_code = code or return_code
+                    else:
+                        done = not chunk
+                    if done:
+                        selector.unregister(key.fileobj)
+                    for output_file in output_files:
+                        output_file.write(chunk)
+                    if console is not None:
+                        console.write(decoder.decode(chunk, final=done))
+        stdout_str = (
+            stdout_io.getvalue().decode(errors="ignore")
+            if stdout_io is not None
+            else None
+        )
+        stderr_str = (
+            stderr_io.getvalue().decode(errors="ignore")
+            if stderr_io is not None
+            else None
+        )
+        return SimpleNamespace(
+            stdout_str=stdout_str,
+            stderr_str=stderr_str,
+            return_code=return_code.decode(),
+        )
 
     def auxiliary_command(
         self, **kwargs
@@ -344,29 +586,38 @@ class Shell:
         err = self.aux_stderr_wfd
         if os.name in kwargs:
             cmd = kwargs[os.name]
-            os.write(self.aux_stdin_wfd, f"{cmd} 1>&{out} 2>&{err}\n".encode())
-            os.write(self.aux_stdin_wfd, f"printf '\\4' 1>&{out}\n".encode())
-            os.write(self.aux_stdin_wfd, f"printf '\\4' 1>&{err}\n".encode())
-            stdout = ""
-            stderr = ""
-
-            max_anonymous_pipe_buffer_size = 65536
-            aux = os.read(self.aux_stdout_rfd, max_anonymous_pipe_buffer_size)
-            while aux[-1] != END_OF_READ:
-                stdout += aux.decode()
-                aux = os.read(
-                    self.aux_stdout_rfd, max_anonymous_pipe_buffer_size
-                )
-            aux = aux[:-1]
-            stdout += aux.decode()
-            aux = os.read(self.aux_stderr_rfd, max_anonymous_pipe_buffer_size)
-            while aux[-1] != END_OF_READ:
-                stderr += aux.decode()
-                aux = os.read(
-                    self.aux_stderr_rfd, max_anonymous_pipe_buffer_size
-                )
-            aux = aux[:-1]
-            stderr += aux.decode()
+            os.writev(
+                self.aux_stdin_wfd,
+                [
+                    f"{cmd} 1>&{out} 2>&{err}\n".encode(),
+                    f"printf '\\4' 1>&{out}\n".encode(),
+                    f"printf '\\4' 1>&{err}\n".encode(),
+                ],
+            )
+
+            def read(fd: int) -> str:
+                """
+                Read from an auxiliary file descriptor.
+
+                Parameters:
+                    fd:  The file descriptor from which to read.
+
+                Returns:
+                    Everything written to ``fd`` up to the
+                    end-of-transmission character.
+                """
+                max_anonymous_pipe_buffer_size = 65536
+                data = bytearray()
+                while not data or data[-1] != END_OF_READ:
+                    chunk = os.read(fd, max_anonymous_pipe_buffer_size)
+                    if not chunk:
+                        message = "The underlying shell closed unexpectedly."
+                        raise RuntimeError(message)
+                    data += chunk
+                return data[:-1].decode()
+
+            stdout = read(self.aux_stdout_rfd)
+            stderr = read(self.aux_stderr_rfd)
             if kwargs.get("strip"):
                 if stdout:
                     stdout = stdout.strip()
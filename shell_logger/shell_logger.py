@@ -10,13 +10,13 @@ from __future__ import annotations
 
 import json
 import os
-import random
+import resource
+import secrets
+import shlex
 import shutil
-import string
 import tempfile
-from collections.abc import Iterable, Mapping
+from collections.abc import Callable, Iterable, Mapping, Sequence
 from datetime import datetime, timedelta
-from distutils import dir_util
 from pathlib import Path
 from types import SimpleNamespace
 from typing import Iterator, Optional, Union
@@ -33,9 +33,22 @@ from .html_utilities import (
     parent_logger_card_html,
 )
 from .shell import Shell
-from .stats_collector import stats_collectors
+from .stats_collector import stats_sampler
 from .trace_collector import trace_collector
 
+try:
+    import orjson
+except ModuleNotFoundError:
+    orjson = None
+
+
+# The formats used when converting dates and times to strings.
+STREAM_DIR_FORMAT = "%Y-%m-%d_%H.%M.%S.%f_"
+TIMESTAMP_FORMAT = "%Y-%m-%d_%H%M%S"
+
+# The format used when converting time deltas to strings.
+DURATION_FORMAT = "{hrs}h {min}m {sec}s"
+
 
 class ShellLogger:
     """
@@ -123,8 +136,8 @@ class ShellLogger:
                 raise RuntimeError(message) from error
         if path.is_symlink():
             path = path.resolve(strict=True)
-        if path.is_file() and path.name[-5:] == ".html":
-            path = path.parent / (path.name[:-5] + ".json")
+        if path.is_file() and path.suffix == ".html":
+            path = path.with_suffix(".json")
 
         # Deserialize the corresponding JSON object into a ShellLogger.
         with path.open("r") as jf:
@@ -187,14 +200,18 @@ class ShellLogger:
         self.duration = duration
         self.indent = indent
         self.login_shell = login_shell
-        self.shell = Shell(Path.cwd(), login_shell=self.login_shell)
+        self.shell = Shell(login_shell=self.login_shell)
+
+        # Children are usually handed their parent's paths, which are
+        # already absolute, so only relative paths need resolving.
+        def resolve(path: Path) -> Path:
+            return path if path.is_absolute() else path.resolve()
 
         # Create the log directory, if needed.
         if log_dir is None:
             log_dir = Path.cwd()
-        self.log_dir = log_dir.resolve()
-        if not self.log_dir.exists():
-            self.log_dir.mkdir(parents=True, exist_ok=True)
+        self.log_dir = resolve(log_dir)
+        self.log_dir.mkdir(parents=True, exist_ok=True)
 
         # If there isn't a `stream_dir` given by the parent ShellLogger, this
         # is the parent; create the `stream_dir`.
@@ -202,11 +219,11 @@ class ShellLogger:
             self.stream_dir = Path(
                 tempfile.mkdtemp(
                     dir=self.log_dir,
-                    prefix=self.init_time.strftime("%Y-%m-%d_%H.%M.%S.%f_"),
+                    prefix=self.init_time.strftime(STREAM_DIR_FORMAT),
                 )
-            ).resolve()
+            )
         else:
-            self.stream_dir = stream_dir.resolve()
+            self.stream_dir = resolve(stream_dir)
 
         # Create (or append to) the HTML log file.
         if html_file is None:
@@ -214,7 +231,7 @@ class ShellLogger:
                 self.name.replace(" ", "_") + ".html"
             )
         else:
-            self.html_file = html_file.resolve()
+            self.html_file = resolve(html_file)
         if self.is_parent():
             if self.html_file.exists():
                 with self.html_file.open("a") as f:
@@ -256,7 +273,7 @@ class ShellLogger:
         """
         self.update_done_time()
         self.duration = self.strfdelta(
-            self.done_time - self.init_time, "{hrs}h {min}m {sec}s"
+            self.done_time - self.init_time, DURATION_FORMAT
         )
 
     def check_duration(self) -> str:
@@ -269,9 +286,7 @@ class ShellLogger:
         Returns:
             A string representation of the total duration.
         """
-        return self.strfdelta(
-            datetime.now() - self.init_time, "{hrs}h {min}m {sec}s"
-        )
+        return self.strfdelta(datetime.now() - self.init_time, DURATION_FORMAT)
 
     def change_log_dir(self, new_log_dir: Path) -> None:
         """
@@ -296,20 +311,62 @@ class ShellLogger:
 
         # This only gets executed once by the top-level parent
         # `ShellLogger` object.
+        new_log_dir = new_log_dir.resolve()
+        # Moving the directory is cheap if it stays on the same file
+        # system; otherwise fall back to copying it.
         if self.log_dir.exists():
-            dir_util.copy_tree(str(self.log_dir), str(new_log_dir))
-            shutil.rmtree(self.log_dir)
+            new_log_dir.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                self.log_dir.rename(new_log_dir)
+            except OSError:
+                shutil.copytree(self.log_dir, new_log_dir, dirs_exist_ok=True)
+                shutil.rmtree(self.log_dir)
+            else:
+                self.__relink(new_log_dir)
+
+        # Change the `stream_dir`, `html_file`, and `log_dir` for this
+        # `ShellLogger` and every descendant.  Children share the
+        # parent's directories, so they're rebased directly, rather than
+        # via `change_log_dir()`, which may only be called on a parent,
+        # and each distinct path only needs to be rebased once.
+        old_log_dir = self.log_dir
+        rebased = {}
+
+        def rebase(path: Path) -> Path:
+            if path not in rebased:
+                rebased[path] = new_log_dir / path.relative_to(old_log_dir)
+            return rebased[path]
+
+        loggers = [self]
+        while loggers:
+            logger = loggers.pop()
+            logger.stream_dir = rebase(logger.stream_dir)
+            logger.html_file = rebase(logger.html_file)
+            logger.log_dir = new_log_dir
+            loggers.extend(
+                log for log in logger.log_book if isinstance(log, ShellLogger)
+            )
 
-        # Change the `stream_dir`, `html_file`, and `log_dir` for every
-        # child `ShellLogger` recursively.
-        self.stream_dir = new_log_dir / self.stream_dir.relative_to(
-            self.log_dir
-        )
-        self.html_file = new_log_dir / self.html_file.relative_to(self.log_dir)
-        self.log_dir = new_log_dir.resolve()
-        for log in self.log_book:
-            if isinstance(log, ShellLogger):
-                log.change_log_dir(self.log_dir)
+    def __relink(self, new_log_dir: Path) -> None:
+        """
+        Update symbolic links after moving the log directory.
+
+        Any links in the new log directory that point into the old one
+        (e.g., to the latest HTML log file) are re-pointed to the
+        corresponding location in the new one.
+
+        Parameters:
+            new_log_dir:  The location to which the :attr:`log_dir` was
+                moved.
+        """
+        for path in new_log_dir.iterdir():
+            if path.is_symlink():
+                target = path.readlink()
+                if target.is_relative_to(self.log_dir):
+                    path.unlink()
+                    path.symlink_to(
+                        new_log_dir / target.relative_to(self.log_dir)
+                    )
 
     def add_child(self, child_name: str) -> ShellLogger:
         """
@@ -355,23 +412,25 @@ class ShellLogger:
         Returns:
             A string representation of the time delta.
         """
-        # Dictionary to hold time delta info.
-        d = {"days": delta.days}
         microseconds_per_second = 10**6
         seconds_per_minute = 60
         minutes_per_hour = 60
         total_ms = delta.microseconds + delta.seconds * microseconds_per_second
-        d["hrs"], rem = divmod(
+        hrs, rem = divmod(
             total_ms,
             (minutes_per_hour * seconds_per_minute * microseconds_per_second),
         )
-        d["min"], rem = divmod(
-            rem, (seconds_per_minute * microseconds_per_second)
-        )
-        d["sec"] = rem / microseconds_per_second
+        mins, rem = divmod(rem, (seconds_per_minute * microseconds_per_second))
 
         # Round to 2 decimals
-        d["sec"] = round(d["sec"], 2)
+        sec = round(rem / microseconds_per_second, 2)
+
+        # Skip building the dictionary for the format we use ourselves.
+        if fmt == DURATION_FORMAT:
+            return f"{hrs}h {mins}m {sec}s"
+
+        # Dictionary to hold time delta info.
+        d = {"days": delta.days, "hrs": hrs, "min": mins, "sec": sec}
 
         # String template to help with recognizing the format.
         return fmt.format(**d)
@@ -443,25 +502,31 @@ class ShellLogger:
             return parent_logger_card_html(self.name, html)
         return html
 
-    def finalize(self) -> None:
+    def finalize(self, *, pretty_json: bool = False) -> None:
         """
         Finalize the :class:`ShellLogger` object.
 
-        Write the HTML log file.
-        """
-        if self.is_parent():
-            html_text = opening_html_text() + "\n"
-            with self.html_file.open("w") as f:
-                f.write(html_text)
+        Write the HTML log file, and, for the parent, the JSON file from
+        which it can be recreated.
 
-        for element in self.to_html():
-            append_html(element, output=self.html_file)
+        Parameters:
+            pretty_json:  Whether to indent the JSON file by two spaces
+                and sort its keys, such that it's easier for humans to
+                read.  This is slower, so the JSON is written compactly
+                by default.
+        """
+        # Use a large buffer, such that the many small pieces of HTML
+        # are flushed to disk in a few big writes.
+        mode = "w" if self.is_parent() else "a"
+        with self.html_file.open(mode, buffering=2**20) as html:
+            if self.is_parent():
+                html.write(opening_html_text() + "\n")
+            for element in self.to_html():
+                append_html(element, output=html)
+            if self.is_parent():
+                html.write(closing_html_text() + "\n")
 
         if self.is_parent():
-            with self.html_file.open("a") as html:
-                html.write(closing_html_text())
-                html.write("\n")
-
             # Create a symlink in `log_dir` to the HTML file in
             # `stream_dir`.
             curr_html_file = self.html_file.name
@@ -475,9 +540,28 @@ class ShellLogger:
             json_file = self.stream_dir / (
                 self.name.replace(" ", "_") + ".json"
             )
-            with json_file.open("w") as jf:
-                json.dump(
-                    self, jf, cls=ShellLoggerEncoder, sort_keys=True, indent=4
+            if orjson is not None:
+                encoder = ShellLoggerEncoder()
+                json_file.write_bytes(
+                    orjson.dumps(
+                        encoder.default(self),
+                        default=encoder.default,
+                        option=(
+                            orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS
+                            if pretty_json
+                            else 0
+                        ),
+                    )
+                )
+            else:
+                json_file.write_text(
+                    json.dumps(
+                        self,
+                        cls=ShellLoggerEncoder,
+                        check_circular=False,
+                        sort_keys=pretty_json,
+                        indent=2 if pretty_json else None,
+                    )
                 )
 
     def log(  # noqa: PLR0913
@@ -491,6 +575,7 @@ class ShellLogger:
         return_info: bool = False,
         verbose: bool = False,
         stdin_redirect: bool = True,
+        measure_min_duration: float = 0.0,
         **kwargs,
     ) -> dict:
         """
@@ -518,6 +603,10 @@ class ShellLogger:
                 some cases (e.g., involving ``bsub``) the redirect
                 causes problems, and we need the flexibility to revert
                 back to standard behavior.
+            measure_min_duration:  If the command finishes in fewer
+                than this many seconds, discard any statistics that were
+                collected while it ran, as there won't be enough data
+                points for them to be meaningful.
             **kwargs:  Any other keyword arguments to pass on to
                 :func:`_run`.
 
@@ -539,35 +628,20 @@ class ShellLogger:
         # Create a unique command ID that will be used to find the
         # location of the `stdout`/`stderr` files in the temporary
         # directory during finalization.
-        cmd_id = "cmd_" + "".join(
-            random.choice(string.ascii_lowercase) for _ in range(9)
-        )
+        cmd_id = "cmd_" + secrets.token_hex(5)[:9]
 
-        # Create & open files for `stdout`, `stderr`, and trace data.
-        time_str = start_time.strftime("%Y-%m-%d_%H%M%S")
-        stdout_path = self.stream_dir / f"{time_str}_{cmd_id}_stdout"
-        stderr_path = self.stream_dir / f"{time_str}_{cmd_id}_stderr"
+        # Determine the files for `stdout`, `stderr`, and trace data.
+        time_str = start_time.strftime(TIMESTAMP_FORMAT)
+        stem = f"{time_str}_{cmd_id}"
+        stdout_path = self.stream_dir / f"{stem}_stdout"
+        stderr_path = self.stream_dir / f"{stem}_stderr"
         trace_path = (
-            self.stream_dir / f"{time_str}_{cmd_id}_trace"
-            if kwargs.get("trace")
-            else None
+            self.stream_dir / f"{stem}_trace" if kwargs.get("trace") else None
         )
 
         # Print the command to be executed.
-        with stdout_path.open("a"), stderr_path.open("a"):
-            if verbose:
-                print(cmd)
-
-        # Initialize the log information.
-        log = {
-            "msg": msg,
-            "duration": None,
-            "timestamp": start_time.strftime("%Y-%m-%d_%H%M%S"),
-            "cmd": cmd,
-            "cmd_id": cmd_id,
-            "cwd": cwd,
-            "return_code": 0,
-        }
+        if verbose:
+            print(cmd)
 
         # Execute the command.
         result = self._run(
@@ -585,20 +659,105 @@ class ShellLogger:
             **kwargs,
         )
 
-        # Update the log information and save it to the `log_book`.
+        # Save the log information to the `log_book`.
+        if result.wall < measure_min_duration * 1000:
+            result.stats = None
         h = int(result.wall / 3600000)
         m = int(result.wall / 60000) % 60
         s = int(result.wall / 1000) % 60
-        log["duration"] = f"{h}h {m}m {s}s"
-        log["return_code"] = result.returncode
-        log |= nested_simplenamespace_to_dict(result)
-        self.log_book.append(log)
+        self.log_book.append(
+            {
+                "msg": msg,
+                "duration": f"{h}h {m}m {s}s",
+                "timestamp": time_str,
+                "cmd": cmd,
+                "cmd_id": cmd_id,
+                "cwd": cwd,
+                "return_code": result.returncode,
+                **nested_simplenamespace_to_dict(result),
+            }
+        )
         return {
-            "return_code": log["return_code"],
+            "return_code": result.returncode,
             "stdout": result.stdout,
             "stderr": result.stderr,
         }
 
+    def log_exec(self, msg: str, argv: Sequence[str], **kwargs) -> dict:
+        """
+        Execute a command directly, and log the corresponding information.
+
+        Unlike :func:`log`, the command isn't passed through the
+        underlying :class:`Shell`, but is instead spawned as a
+        subprocess of its own, whose output is read in large blocks.
+        This is worthwhile for long-running commands that produce a lot
+        of output (e.g., ``git clone`` or ``make``), but it means shell
+        syntax (pipes, redirects, variable expansion, etc.) isn't
+        available.
+
+        Parameters:
+            msg:  A message to be recorded with the command.
+            argv:  The program to be executed, followed by its
+                arguments.
+            **kwargs:  Any other keyword arguments to pass on to
+                :func:`log`.
+
+        Returns:
+            The same dictionary as :func:`log`.
+
+        Raises:
+            TypeError:  If ``argv`` is a single string, rather than a
+                sequence of them.
+
+        Note:
+            The command is run in the :class:`Shell` 's current working
+            directory, but it inherits the environment, umask, and
+            ulimit of the Python process, rather than those of the
+            :class:`Shell`, so those are what get logged.
+        """
+        if isinstance(argv, str):
+            message = (
+                "`argv` must be a sequence of strings, not a single string; "
+                "use `log()` to run a command through the shell."
+            )
+            raise TypeError(message)
+        return self.log(msg, shlex.join(argv), argv=list(argv), **kwargs)
+
+    def log_batch(
+        self,
+        entries: Iterable[tuple[str, Union[str, Sequence[str]], dict]],
+        **kwargs,
+    ) -> list[dict]:
+        """
+        Execute a series of commands, logging each in turn.
+
+        All the commands are run, one after another, in this
+        :class:`ShellLogger` object's persistent :class:`Shell`, such
+        that there's only one entry point for the caller, rather than
+        one call to :func:`log` per command.
+
+        Parameters:
+            entries:  A collection of ``(msg, cmd, kwargs)`` tuples,
+                where ``msg`` and ``cmd`` are as in :func:`log`, and
+                ``kwargs`` is a dictionary of any additional keyword
+                arguments to pass to :func:`log` for that particular
+                command.  If ``cmd`` is a list of strings rather than a
+                string, it's run via :func:`log_exec` instead.
+            **kwargs:  Any keyword arguments to pass to :func:`log` for
+                every command.  These are overridden by any given for an
+                individual entry.
+
+        Returns:
+            A list of the dictionaries returned by :func:`log`, one per
+            entry, in the order in which the commands were run.
+        """
+        return [
+            (self.log if isinstance(cmd, str) else self.log_exec)(
+                msg, cmd, **{**kwargs, **entry_kwargs}
+            )
+            for msg, cmd, entry_kwargs in entries
+        ]
+
     def _run(self, command: str, **kwargs) -> SimpleNamespace:
         """
         Execute a command, capturing various information as you go.
@@ -622,70 +781,82 @@ class ShellLogger:
                 kwargs[key] = True
 
         # Change to the directory in which to execute the command.
-        old_pwd = Path.cwd()
         if kwargs.get("pwd"):
+            old_pwd = Path.cwd()
             self.shell.cd(kwargs.get("pwd"))
-        aux_info = self.auxiliary_information()
-
-        # Stats collectors use a multiprocessing manager that creates
-        # unix domain sockets with names determined by
-        # `tempfile.mktemp`, which looks at `TMPDIR`.  If `TMPDIR` is
-        # too long, it may result in the multiprocessing manager trying
-        # to use a string too long for UNIX domain sockets, resulting in
-        # "OSError: AF_UNIX path too long."  The typical maximum path
-        # length on Linux is 108.  See: `grep '#define UNIX_PATH_MAX'
-        # /usr/include/linux/un.h`.
-        old_tmpdir = os.environ.get("TMPDIR")
-        os.environ["TMPDIR"] = "/tmp"
-
-        # Start up any stats or trace collectors the user has requested.
-        collectors = stats_collectors(**kwargs)
-        stats = {} if len(collectors) > 0 else None
-        for collector in collectors:
-            collector.start()
-        if old_tmpdir is not None:
-            os.environ["TMPDIR"] = old_tmpdir
-        else:
-            os.unsetenv("TMPDIR")
-            del os.environ["TMPDIR"]
-        if "trace" in kwargs:
-            trace = trace_collector(**kwargs)
-            command = trace.command(command)
-            trace_output = trace.output_path
-
-        # Run the command, and stop any collectors that were started.
-        completed_process = self.shell.run(command, **kwargs)
-        for collector in collectors:
-            stats[collector.stat_name] = collector.finish()
-        completed_process.trace_path = trace_output
-        completed_process.stats = stats
-        if kwargs.get("trace_str") and trace_output:
-            with trace_output.open() as f:
-                completed_process.trace = f.read()
-        else:
-            completed_process.trace = None
+        try:
+            argv = kwargs.pop("argv", None)
+            aux_info = self.auxiliary_information(inherited=bool(argv))
+
+            # Start up any stats or trace collectors the user has
+            # requested.
+            sampler = stats_sampler(**kwargs)
+            if sampler is not None:
+                sampler.start()
+            try:
+                if "trace" in kwargs:
+                    trace = trace_collector(**kwargs)
+                    command = trace.command(command)
+                    argv = trace.argv(argv) if argv else None
+                    trace_output = trace.output_path
+
+                # Run the command.
+                completed_process = (
+                    self.shell.execute(argv, cwd=aux_info.pwd, **kwargs)
+                    if argv
+                    else self.shell.run(command, **kwargs)
+                )
 
-        # Change back to the original directory and return the results.
-        if kwargs.get("pwd"):
-            self.shell.cd(old_pwd)
+            # Stop any collectors that were started, even if the command
+            # couldn't be run.
+            finally:
+                stats = sampler.finish() if sampler is not None else None
+            completed_process.trace_path = trace_output
+            completed_process.stats = stats
+            if kwargs.get("trace_str") and trace_output:
+                with trace_output.open() as f:
+                    completed_process.trace = f.read()
+            else:
+                completed_process.trace = None
+
+        # Change back to the original directory, whether or not the
+        # command could be run.  If the shell itself has exited, only
+        # this process can change back.
+        finally:
+            if kwargs.get("pwd"):
+                if self.shell.aux_stdin_wfd is None:
+                    os.chdir(old_pwd)
+                else:
+                    self.shell.cd(old_pwd)
         return SimpleNamespace(
             **completed_process.__dict__, **aux_info.__dict__
         )
 
-    def auxiliary_information(self) -> SimpleNamespace:
+    def auxiliary_information(
+        self, *, inherited: bool = False
+    ) -> SimpleNamespace:
         """
         Grab auxiliary information.
 
         Capture all sorts of auxiliary information before running a
         command.
 
+        Parameters:
+            inherited:  Whether the command inherits its environment,
+                umask, and ulimit from this Python process, as for
+                :func:`log_exec`, rather than from the :class:`Shell`.
+
         Returns:
             The working directory, environment, umask, hostname, user,
             group, shell, and ulimit.
         """
         pwd, _ = self.shell.auxiliary_command(posix="pwd", strip=True)
-        environment, _ = self.shell.auxiliary_command(posix="env")
-        umask, _ = self.shell.auxiliary_command(posix="umask", strip=True)
+        if inherited:
+            environment, umask, ulimit = self.process_information()
+        else:
+            environment, _ = self.shell.auxiliary_command(posix="env")
+            umask, _ = self.shell.auxiliary_command(posix="umask", strip=True)
+            ulimit, _ = self.shell.auxiliary_command(posix="ulimit -a")
         hostname, _ = self.shell.auxiliary_command(
             posix="hostname", strip=True
         )
@@ -694,7 +865,6 @@ class ShellLogger:
         shell, _ = self.shell.auxiliary_command(
             posix="printenv SHELL", strip=True
         )
-        ulimit, _ = self.shell.auxiliary_command(posix="ulimit -a")
         return SimpleNamespace(
             pwd=pwd,
             environment=environment,
@@ -706,6 +876,33 @@ class ShellLogger:
             ulimit=ulimit,
         )
 
+    @staticmethod
+    def process_information() -> tuple[str, str, str]:
+        """
+        Grab the environment, umask, and ulimit of this Python process.
+
+        These are what a command run by :func:`log_exec` inherits, and
+        they're formatted like the output of ``env``, ``umask``, and
+        ``ulimit -a``, respectively.
+
+        Returns:
+            The environment, umask, and ulimit.
+        """
+        environment = "".join(f"{k}={v}\n" for k, v in os.environ.items())
+
+        # The umask can only be read by setting it, so put it right back.
+        mask = os.umask(0)
+        os.umask(mask)
+        umask = f"{mask:04o}"
+        limits = []
+        for name in sorted(
+            n for n in dir(resource) if n.startswith("RLIMIT_")
+        ):
+            soft, _ = resource.getrlimit(getattr(resource, name))
+            value = "unlimited" if soft == resource.RLIM_INFINITY else soft
+            limits.append(f"{name.removeprefix('RLIMIT_').lower()} {value}\n")
+        return environment, umask, "".join(limits)
+
 
 class ShellLoggerEncoder(json.JSONEncoder):
     """
@@ -722,7 +919,7 @@ class ShellLoggerEncoder(json.JSONEncoder):
             json.dump(data, jf, cls=ShellLoggerEncoder)
     """
 
-    def default(self, obj: object) -> object:  # noqa: PLR0911
+    def default(self, obj: object) -> object:
         """
         Serialize an object; that is, encode it in a string format.
 
@@ -732,37 +929,128 @@ class ShellLoggerEncoder(json.JSONEncoder):
         Returns:
             The JSON serialization of the given object.
         """
-        if isinstance(obj, ShellLogger):
-            return {
-                **{"__type__": "ShellLogger"},
-                **{k: self.default(v) for k, v in obj.__dict__.items()},
-            }
-        if isinstance(obj, (int, float, str, bytes)):
+        encode = self._dispatch.get(type(obj))
+        if encode is None:
+            encode = self._lookup(type(obj))
+        return encode(self, obj)
+
+    def _encode_value(self, obj: object) -> object:
+        """
+        Encode a value nested within a container.
+
+        Parameters:
+            obj:  Any Python object.
+
+        Returns:
+            The object itself, if it's a scalar that's already JSON
+            serializable, or else its serialization via :func:`default`.
+
+        Note:
+            Most of the values in a log book are strings and numbers,
+            so skipping the dispatch for them avoids a method call per
+            leaf.  Containers still need to be walked here, rather than
+            by the JSON encoder itself, such that tuples can be tagged
+            and restored as tuples when decoding.
+        """
+        if type(obj) in self._scalars:
             return obj
-        if isinstance(obj, Mapping):
-            return {k: self.default(v) for k, v in obj.items()}
-        if isinstance(obj, tuple):
-            return {"__type__": "tuple", "items": obj}
-        if isinstance(obj, Iterable):
-            return [self.default(x) for x in obj]
-        if isinstance(obj, datetime):
-            return {
-                "__type__": "datetime",
-                "value": obj.strftime("%Y-%m-%d_%H:%M:%S:%f"),
-                "format": "%Y-%m-%d_%H:%M:%S:%f",
-            }
-        if isinstance(obj, Path):
-            return {"__type__": "Path", "value": str(obj)}
-        if obj is None:
-            return None
-        if isinstance(obj, Shell):
-            return {
-                "__type__": "Shell",
-                "pwd": obj.pwd(),
-                "login_shell": obj.login_shell,
-            }
+        return self.default(obj)
+
+    def _encode_shell_logger(self, obj: ShellLogger) -> dict:
+        """Encode a :class:`ShellLogger` and everything in it."""
+        return {
+            **{"__type__": "ShellLogger"},
+            **{k: self._encode_value(v) for k, v in obj.__dict__.items()},
+        }
+
+    def _encode_as_is(self, obj: object) -> object:
+        """Leave an object that's already JSON serializable unchanged."""
+        return obj
+
+    def _encode_mapping(self, obj: Mapping) -> dict:
+        """Encode each of the values in a mapping."""
+        return {k: self._encode_value(v) for k, v in obj.items()}
+
+    def _encode_tuple(self, obj: tuple) -> dict:
+        """Encode a tuple such that it can be decoded as such."""
+        return {"__type__": "tuple", "items": obj}
+
+    def _encode_iterable(self, obj: Iterable) -> list:
+        """Encode each of the items in an iterable."""
+        return [self._encode_value(x) for x in obj]
+
+    def _encode_datetime(self, obj: datetime) -> dict:
+        """Encode a date and time in ISO 8601 format."""
+        return {"__type__": "datetime", "value": obj.isoformat()}
+
+    def _encode_path(self, obj: Path) -> dict:
+        """Encode a path."""
+        return {"__type__": "Path", "value": str(obj)}
+
+    def _encode_shell(self, obj: Shell) -> dict:
+        """Encode a :class:`Shell`, such that it can be recreated."""
+        return {
+            "__type__": "Shell",
+            "pwd": obj.pwd(),
+            "login_shell": obj.login_shell,
+        }
+
+    def _encode_unsupported(self, obj: object) -> object:
+        """Defer to the base class, which raises a ``TypeError``."""
         return json.JSONEncoder.default(self, obj)
 
+    # The encoders to use for the supported types, in priority order.
+    _rules = (
+        (ShellLogger, "_encode_shell_logger"),
+        ((int, float, str, bytes), "_encode_as_is"),
+        (Mapping, "_encode_mapping"),
+        (tuple, "_encode_tuple"),
+        (Iterable, "_encode_iterable"),
+        (datetime, "_encode_datetime"),
+        (Path, "_encode_path"),
+        (type(None), "_encode_as_is"),
+        (Shell, "_encode_shell"),
+    )
+
+    # The types that can be left as they are without any dispatch.
+    _scalars = frozenset((str, int, float, bool, type(None)))
+
+    # A mapping from the types encountered so far to their encoders.
+    # Each subclass gets its own, such that it picks up any encoders it
+    # overrides.
+    _dispatch = {}  # noqa: RUF012
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        """
+        Give a subclass its own dispatch table.
+
+        Parameters:
+            **kwargs:  Any arguments for the parent class.
+        """
+        super().__init_subclass__(**kwargs)
+        cls._dispatch = {}
+
+    @classmethod
+    def _lookup(cls, obj_type: type) -> Callable:
+        """
+        Find the encoder for a type not yet in the dispatch table.
+
+        Parameters:
+            obj_type:  The type of the object to be encoded.
+
+        Returns:
+            The first encoder from the rules matching the type, as
+            defined by this class, which is then cached in its dispatch
+            table for subsequent lookups.
+        """
+        name = next(
+            (f for t, f in cls._rules if issubclass(obj_type, t)),
+            "_encode_unsupported",
+        )
+        encode = getattr(cls, name)
+        cls._dispatch[obj_type] = encode
+        return encode
+
 
 class ShellLoggerDecoder(json.JSONDecoder):
     """
@@ -784,7 +1072,7 @@ class ShellLoggerDecoder(json.JSONDecoder):
         json.JSONDecoder.__init__(self, object_hook=self.dict_to_object)
 
     @staticmethod
-    def dict_to_object(obj: dict) -> object:  # noqa: PLR0911
+    def dict_to_object(obj: dict) -> object:
         """
         Convert a ``dict`` to a corresponding object.
 
@@ -799,25 +1087,53 @@ class ShellLoggerDecoder(json.JSONDecoder):
         """
         if "__type__" not in obj:
             return obj
-        if obj["__type__"] == "ShellLogger":
-            return ShellLogger(
-                obj["name"],
-                log_dir=obj["log_dir"],
-                stream_dir=obj["stream_dir"],
-                html_file=obj["html_file"],
-                indent=obj["indent"],
-                login_shell=obj["login_shell"],
-                log=obj["log_book"],
-                init_time=obj["init_time"],
-                done_time=obj["done_time"],
-                duration=obj["duration"],
-            )
-        if obj["__type__"] == "datetime":
+        decode = ShellLoggerDecoder._decoders.get(obj["__type__"])
+        return None if decode is None else decode(obj)
+
+    @staticmethod
+    def _decode_shell_logger(obj: dict) -> ShellLogger:
+        """Recreate a :class:`ShellLogger` and everything in it."""
+        return ShellLogger(
+            obj["name"],
+            log_dir=obj["log_dir"],
+            stream_dir=obj["stream_dir"],
+            html_file=obj["html_file"],
+            indent=obj["indent"],
+            login_shell=obj["login_shell"],
+            log=obj["log_book"],
+            init_time=obj["init_time"],
+            done_time=obj["done_time"],
+            duration=obj["duration"],
+        )
+
+    @staticmethod
+    def _decode_datetime(obj: dict) -> datetime:
+        """Decode a date and time."""
+        # Logs written by older versions include the format used.
+        if "format" in obj:
             return datetime.strptime(obj["value"], obj["format"])
-        if obj["__type__"] == "Path":
-            return Path(obj["value"])
-        if obj["__type__"] == "tuple":
-            return tuple(obj["items"])
-        if obj["__type__"] == "Shell":
-            return Shell(Path(obj["pwd"]), login_shell=obj["login_shell"])
-        return None
+        return datetime.fromisoformat(obj["value"])
+
+    @staticmethod
+    def _decode_path(obj: dict) -> Path:
+        """Decode a path."""
+        return Path(obj["value"])
+
+    @staticmethod
+    def _decode_tuple(obj: dict) -> tuple:
+        """Decode a tuple."""
+        return tuple(obj["items"])
+
+    @staticmethod
+    def _decode_shell(obj: dict) -> Shell:
+        """Recreate a :class:`Shell` in the same working directory."""
+        return Shell(Path(obj["pwd"]), login_shell=obj["login_shell"])
+
+    # A mapping from the serialized type names to their decoders.
+    _decoders = {  # noqa: RUF012
+        "ShellLogger": _decode_shell_logger.__func__,
+        "datetime": _decode_datetime.__func__,
+        "Path": _decode_path.__func__,
+        "tuple": _decode_tuple.__func__,
+        "Shell": _decode_shell.__func__,
+    }
@@ -10,16 +10,14 @@ from __future__ import annotations
 
 import os
 from abc import abstractmethod
-from multiprocessing import Manager, Process
+from functools import lru_cache
 from pathlib import Path
-from time import sleep, time
-from typing import TYPE_CHECKING
+from threading import Event, Thread
+from time import monotonic, time
+from typing import Optional
 
 from .abstract_method import AbstractMethod
 
-if TYPE_CHECKING:
-    from multiprocessing.managers import SyncManager
-
 try:
     import psutil
 except ModuleNotFoundError:
@@ -42,15 +40,56 @@ def stats_collectors(**kwargs) -> list[StatsCollector]:
         A collection of instances of :class:`StatsCollector` subclasses.
     """
     collectors = []
-    if "measure" in kwargs:
-        interval = kwargs.get("interval", 1.0)
-        manager = Manager()
-        for collector in StatsCollector.subclasses:
-            if collector.stat_name in kwargs["measure"]:
-                collectors.append(collector(interval, manager))
+    if kwargs.get("measure"):
+        for collector in collector_classes(tuple(kwargs["measure"])):
+            collectors.append(collector())
     return collectors
 
 
+def stats_sampler(**kwargs) -> Optional[StatsSampler]:
+    """
+    Generate a stats sampler.
+
+    A factory method that returns a :class:`StatsSampler` to drive all
+    the stats collectors generated by :func:`stats_collectors`.
+
+    Parameters:
+        **kwargs:  Any supported arguments of the
+            :class:`StatsCollector` subclasses, along with the
+            ``interval`` at which to collect the statistics.
+
+    Returns:
+        A :class:`StatsSampler`, or ``None`` if no statistics are to be
+        collected.
+    """
+    collectors = stats_collectors(**kwargs)
+    if not collectors:
+        return None
+    return StatsSampler(collectors, kwargs.get("interval", 1.0))
+
+
+@lru_cache(maxsize=None)
+def collector_classes(measure: tuple[str, ...]) -> tuple[type, ...]:
+    """
+    Determine which stats collectors to use.
+
+    The result is cached, such that repeated requests for the same
+    statistics don't need to search the supported collectors again.
+    The cache is cleared whenever another collector is registered via
+    :func:`StatsCollector.subclass`.
+
+    Parameters:
+        measure:  The names of the statistics to collect.
+
+    Returns:
+        The :class:`StatsCollector` subclasses corresponding to the
+        given statistics.
+    """
+    return tuple(
+        c for c in StatsCollector.subclasses if c.stat_name in measure
+    )
+
+
 class StatsCollector:
     """
     Collect statistics while running command in the shell.
@@ -73,44 +112,9 @@ class StatsCollector:
         """
         if issubclass(stats_collector_subclass, StatsCollector):
             StatsCollector.subclasses.append(stats_collector_subclass)
+            collector_classes.cache_clear()
         return stats_collector_subclass
 
-    def __init__(self, interval: float, _: SyncManager):
-        """
-        Initialize the :class:`StatsCollector` object.
-
-        Set the poling interval, and create the process for collecting
-        the statistics.
-
-        Parameters:
-            interval:  How long to sleep between collecting statistics.
-
-        Note:
-            A ``SyncManager`` will be supplied at the second argument
-            for any subclasses.
-        """
-        self.interval = interval
-        self.process = Process(target=self.loop, args=())
-
-    def start(self):
-        """
-        Start a subprocess.
-
-        Poll at a certain interval for certain statistics.
-        """
-        self.process.start()
-
-    def loop(self):
-        """
-        Loop while collecting statistics.
-
-        Infinitely loop, collecting statistics, until the subprocess is
-        terminated.
-        """
-        while True:
-            self.collect()
-            sleep(self.interval)
-
     @abstractmethod
     def collect(self):
         """
@@ -128,23 +132,84 @@ class StatsCollector:
         """
         Convert to standard Python data types.
 
-        Convert from Python's Manager's data structures to base Python
-        data structures.
+        Get a copy of the statistics collected, such that they're no
+        longer modified by any further collection.
 
         Raises:
             AbstractMethod:  This must be overridden by subclasses.
         """
         raise AbstractMethod
 
-    def finish(self):
+
+class StatsSampler:
+    """
+    Poll stats collectors in the background.
+
+    Drives any number of :class:`StatsCollector` objects from a single
+    background thread, which polls each of them in turn at a certain
+    interval.
+    """
+
+    def __init__(
+        self, collectors: list[StatsCollector], interval: float
+    ) -> None:
+        """
+        Initialize the :class:`StatsSampler` object.
+
+        Parameters:
+            collectors:  The stats collectors to poll.
+            interval:  How many seconds to wait between polling.
+        """
+        self.collectors = collectors
+        self.interval = interval
+        self.stop = Event()
+        self.thread = Thread(target=self.loop, daemon=True)
+
+    def start(self) -> None:
+        """
+        Start a thread.
+
+        Poll at a certain interval for certain statistics.
+        """
+        self.thread.start()
+
+    def loop(self) -> None:
+        """
+        Loop while collecting statistics.
+
+        Loop, collecting statistics, until :func:`finish` is called.
+
+        Note:
+            The time spent collecting counts against the interval, such
+            that samples are taken at a steady rate.  If collecting
+            takes longer than the interval, the next sample is taken
+            immediately.
+        """
+        deadline = monotonic()
+        while True:
+            for collector in self.collectors:
+                collector.collect()
+            deadline += self.interval
+            delay = deadline - monotonic()
+            if delay <= 0:
+                deadline, delay = monotonic(), 0
+            if self.stop.wait(delay):
+                return
+
+    def finish(self) -> dict[str, object]:
         """
         Stop collecting statistics.
 
-        Terminate the infinite loop that's collecting the statistics,
-        and then return the unproxied statistics.
+        Stop the loop that's collecting the statistics, and then return
+        them.
+
+        Returns:
+            A mapping from the name of each statistic to the data
+            collected for it.
         """
-        self.process.terminate()
-        return self.unproxied_stats()
+        self.stop.set()
+        self.thread.join()
+        return {c.stat_name: c.unproxied_stats() for c in self.collectors}
 
 
 if psutil is not None:
@@ -160,17 +225,9 @@ if psutil is not None:
 
         stat_name = "disk"
 
-        def __init__(self, interval: float, manager: SyncManager) -> None:
-            """
-            Initialize the :class:`DiskStatsCollector` object.
-
-            Parameters:
-                interval:  How many seconds to sleep between polling.
-                manager:  The multiprocessing manager used to control
-                    the process used to collect the statistics.
-            """
-            super().__init__(interval, manager)
-            self.stats = manager.dict()
+        def __init__(self) -> None:
+            """Initialize the :class:`DiskStatsCollector` object."""
+            self.stats = {}
             self.mount_points = [
                 p.mountpoint for p in psutil.disk_partitions()
             ]
@@ -185,7 +242,7 @@ if psutil is not None:
                 ):
                     self.mount_points.append(location)
             for m in self.mount_points:
-                self.stats[m] = manager.list()
+                self.stats[m] = []
 
         def collect(self) -> None:
             """Poll the disks to determine how much free space they have."""
@@ -198,8 +255,7 @@ if psutil is not None:
             """
             Convert the statistics to standard Python data types.
 
-            Translate the statistics from the multiprocessing
-            ``SyncManager`` 's data structure to a ``dict``.
+            Copy the statistics collected so far into a new ``dict``.
 
             Returns:
                 A mapping from the disk mount points to tuples of
@@ -218,17 +274,9 @@ if psutil is not None:
 
         stat_name = "cpu"
 
-        def __init__(self, interval: float, manager: SyncManager) -> None:
-            """
-            Initialize the :class:`CPUStatsCollector` object.
-
-            Parameters:
-                interval:  How many seconds to sleep between polling.
-                manager:  The multiprocessing manager used to control
-                    the process used to collect the statistics.
-            """
-            super().__init__(interval, manager)
-            self.stats = manager.list()
+        def __init__(self) -> None:
+            """Initialize the :class:`CPUStatsCollector` object."""
+            self.stats = []
 
         def collect(self) -> None:
             """Determine how heavily utilized the CPU is at the moment."""
@@ -240,8 +288,7 @@ if psutil is not None:
             """
             Convert the statistics to standard Python data types.
 
-            Translate the statistics from the multiprocessing
-            ``SyncManager`` 's data structure to a ``list``.
+            Copy the statistics collected so far into a new ``list``.
 
             Returns:
                 A list of (timestamp, % CPU used) data points.
@@ -259,17 +306,9 @@ if psutil is not None:
 
         stat_name = "memory"
 
-        def __init__(self, interval: float, manager: SyncManager) -> None:
-            """
-            Initialize the :class:`MemoryStatsCollector` object.
-
-            Parameters:
-                interval:  How many seconds to sleep between polling.
-                manager:  The multiprocessing manager used to control
-                    the process used to collect the statistics.
-            """
-            super().__init__(interval, manager)
-            self.stats = manager.list()
+        def __init__(self) -> None:
+            """Initialize the :class:`MemoryStatsCollector` object."""
+            self.stats = []
 
         def collect(self) -> None:
             """Determine how much memory is currently being used."""
@@ -281,8 +320,7 @@ if psutil is not None:
             """
             Convert the statistics to standard Python data types.
 
-            Translate the statistics from the multiprocessing
-            ``SyncManager`` 's data structure to a ``list``.
+            Copy the statistics collected so far into a new ``list``.
 
             Returns:
                 A list of (timestamp, % memory used) data points.
@@ -304,17 +342,6 @@ else:
 
         stat_name = "disk"
 
-        def __init__(self, interval: float, manager: SyncManager) -> None:
-            """
-            Initialize the object via the parent's constructor.
-
-            Parameters:
-                interval:  How many seconds to sleep between polling.
-                manager:  The multiprocessing manager used to control
-                    the process used to collect the statistics.
-            """
-            super().__init__(interval, manager)
-
         def collect(self) -> None:
             """Don't collect any disk statistics."""
             pass
@@ -339,17 +366,6 @@ else:
 
         stat_name = "cpu"
 
-        def __init__(self, interval: float, manager: SyncManager) -> None:
-            """
-            Initialize the object via the parent's constructor.
-
-            Parameters:
-                interval:  How many seconds to sleep between polling.
-                manager:  The multiprocessing manager used to control
-                    the process used to collect the statistics.
-            """
-            super().__init__(interval, manager)
-
         def collect(self) -> None:
             """Don't collect any CPU statistics."""
             pass
@@ -374,17 +390,6 @@ else:
 
         stat_name = "memory"
 
-        def __init__(self, interval: float, manager: SyncManager) -> None:
-            """
-            Initialize the object via the parent's constructor.
-
-            Parameters:
-                interval:  How many seconds to sleep between polling.
-                manager:  The multiprocessing manager used to control
-                    the process used to collect the statistics.
-            """
-            super().__init__(interval, manager)
-
         def collect(self) -> None:
             """Don't collect any memory statistics."""
             pass
@@ -8,6 +8,7 @@
 
 from __future__ import annotations
 
+import shlex
 from abc import abstractmethod
 from pathlib import Path
 
@@ -30,9 +31,7 @@ def trace_collector(**kwargs) -> TraceCollector:
         A single instance of a :class:`TraceCollector` subclass.
     """
     trace_name = kwargs["trace"]
-    collectors = [
-        c for c in TraceCollector.subclasses if c.trace_name == trace_name
-    ]
+    collectors = TraceCollector.subclasses_by_name.get(trace_name, [])
     if len(collectors) == 1:
         collector = collectors[0]
         return collector(**kwargs)
@@ -53,6 +52,7 @@ class TraceCollector:
 
     trace_name = "undefined"  # Should be defined by subclasses.
     subclasses = []  # noqa: RUF012
+    subclasses_by_name = {}  # noqa: RUF012
 
     @staticmethod
     def subclass(trace_subclass: type):
@@ -61,10 +61,13 @@ class TraceCollector:
 
         This is a class decorator that adds to a list of supported
         :class:`TraceCollector` classes for the :func:`trace_collector`
-        factory method.
+        factory method, and indexes them by their ``trace_name``.
         """
         if issubclass(trace_subclass, TraceCollector):
             TraceCollector.subclasses.append(trace_subclass)
+            TraceCollector.subclasses_by_name.setdefault(
+                trace_subclass.trace_name, []
+            ).append(trace_subclass)
         return trace_subclass
 
     def __init__(self, **kwargs):
@@ -106,6 +109,19 @@ class TraceCollector:
         """
         return f"{self.trace_args} -- {command}"
 
+    def argv(self, argv: list[str]) -> list[str]:
+        """
+        Get the program and arguments to be run directly.
+
+        Like :func:`command`, but for a command that bypasses the
+        underlying shell.  E.g., ``["ls", "-l"]`` might get translated
+        to ``["strace", "-f", "-c", "-e", "open", "--", "ls", "-l"]``.
+
+        Parameters:
+            argv:  The program to be traced, followed by its arguments.
+        """
+        return [*shlex.split(self.trace_args), "--", *argv]
+
 
 @TraceCollector.subclass
 class STraceCollector(TraceCollector):
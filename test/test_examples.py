@@ -0,0 +1,122 @@
+"""Exercise the scenarios from the ``example`` scripts."""
+
+# © 2023 National Technology & Engineering Solutions of Sandia, LLC
+# (NTESS).  Under the terms of Contract DE-NA0003525 with NTESS, the
+# U.S. Government retains certain rights in this software.
+
+# SPDX-License-Identifier: BSD-3-Clause
+
+from pathlib import Path
+from typing import Union
+
+import pytest
+from _pytest.tmpdir import TempPathFactory
+
+from shell_logger import ShellLogger
+
+
+@pytest.fixture(scope="session")
+def example_logger(tmp_path_factory: TempPathFactory) -> ShellLogger:
+    """
+    Share a single :class:`ShellLogger` across all the example scenarios.
+
+    Parameters:
+        tmp_path_factory:  The ``TempPathFactory`` fixture.
+
+    Returns:
+        The :class:`ShellLogger` in which to log the scenarios.
+    """
+    return ShellLogger("Examples", log_dir=tmp_path_factory.mktemp("log"))
+
+
+@pytest.fixture(scope="session")
+def other_dir(tmp_path_factory: TempPathFactory) -> Path:
+    """
+    Provide a directory other than the current one to run commands in.
+
+    Parameters:
+        tmp_path_factory:  The ``TempPathFactory`` fixture.
+
+    Returns:
+        The path to the directory.
+    """
+    return tmp_path_factory.mktemp("cwd")
+
+
+@pytest.mark.parametrize(
+    ("msg", "cmd", "kwargs", "in_other_dir"),
+    [
+        pytest.param(
+            "Greet everyone to make them feel welcome.",
+            "echo 'Hello World'",
+            {},
+            False,
+            id="hello_world_html",
+        ),
+        pytest.param(
+            "Tell everyone who you are, but from a different directory.",
+            "whoami",
+            {},
+            True,
+            id="hello_world_html_cwd",
+        ),
+        pytest.param(
+            "Greet everyone to make them feel welcome.",
+            "echo 'Hello World'",
+            {"live_stdout": True, "live_stderr": True},
+            False,
+            id="hello_world_html_and_console",
+        ),
+        pytest.param(
+            "Tell everyone who you are, but from a different directory.",
+            "whoami",
+            {"measure": ("cpu", "memory", "disk")},
+            True,
+            id="hello_world_html_with_stats",
+        ),
+        pytest.param(
+            "Check that `make` is available.",
+            ["make", "--version"],
+            {"live_stdout": True, "live_stderr": True},
+            True,
+            id="make_version",
+        ),
+    ],
+)
+def test_example_scenario(  # noqa: PLR0913
+    example_logger: ShellLogger,
+    other_dir: Path,
+    msg: str,
+    cmd: Union[str, list[str]],
+    kwargs: dict,
+    in_other_dir: bool,  # noqa: FBT001
+) -> None:
+    """
+    Ensure each of the example scenarios is logged successfully.
+
+    Parameters:
+        example_logger:  The shared :class:`ShellLogger`.
+        other_dir:  A directory other than the current one.
+        msg:  The message to log with the command.
+        cmd:  The command to run.
+        kwargs:  Any additional arguments for :func:`ShellLogger.log`.
+        in_other_dir:  Whether to run the command in ``other_dir``.
+    """
+    if in_other_dir:
+        kwargs = {**kwargs, "cwd": other_dir}
+    num_entries = len(example_logger.log_book)
+    (result,) = example_logger.log_batch([(msg, cmd, kwargs)])
+    assert result["return_code"] == 0
+    assert len(example_logger.log_book) == num_entries + 1
+    assert example_logger.log_book[-1]["msg"] == msg
+
+
+def test_examples_finalize(example_logger: ShellLogger) -> None:
+    """
+    Ensure the log of all the example scenarios can be finalized.
+
+    Parameters:
+        example_logger:  The shared :class:`ShellLogger`.
+    """
+    example_logger.finalize()
+    assert example_logger.html_file.exists()
@@ -9,7 +9,9 @@
 import json
 import os
 import re
+import threading
 from inspect import stack
+from datetime import datetime, timedelta
 from pathlib import Path
 
 import distro
@@ -17,7 +19,14 @@ import pytest
 from _pytest.capture import CaptureFixture
 from _pytest.monkeypatch import MonkeyPatch
 
-from shell_logger import ShellLogger, ShellLoggerDecoder
+from shell_logger import ShellLogger, ShellLoggerDecoder, ShellLoggerEncoder
+from shell_logger.html_utilities import (
+    MAX_CHART_POINTS,
+    chart_series,
+    get_human_time,
+)
+from shell_logger.shell import Shell
+from shell_logger.stats_collector import StatsCollector, collector_classes
 
 try:
     import psutil
@@ -247,15 +256,24 @@ def test_child_logger_duration_displayed_correctly_in_html(
     assert f"Duration: {child3.duration}" in html_text
 
 
+@pytest.mark.parametrize("use_orjson", [True, False])
 def test_finalize_creates_json_with_correct_information(
     shell_logger: ShellLogger,
+    monkeypatch: MonkeyPatch,
+    use_orjson: bool,  # noqa: FBT001
 ) -> None:
     """
     Ensure :func:`finalize` creates a JSON file with the proper data.
 
     Parameters:
         shell_logger:  A pre-populated :class:`ShellLogger` object.
+        monkeypatch:  The ``MonkeyPatch`` fixture.
+        use_orjson:  Whether or not to use ``orjson``, if available.
     """
+    if use_orjson:
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr("shell_logger.shell_logger.orjson", None)
     shell_logger.finalize()
 
     # Load from JSON.
@@ -942,3 +960,336 @@ def test_invalid_decodings() -> None:
         return_info=True,
     )
     assert result["stdout"] == "Hello\n"
+
+
+def test_log_batch() -> None:
+    """Ensure a batch of commands is logged in order."""
+    logger = ShellLogger(stack()[0][3], log_dir=Path.cwd())
+    results = logger.log_batch(
+        [
+            ("Say hello.", "echo hello", {}),
+            ("Say goodbye.", "echo goodbye", {"return_info": False}),
+            ("Print the directory.", "pwd", {"cwd": Path("/tmp")}),
+        ],
+        return_info=True,
+    )
+    expected_length = 3
+    assert len(results) == expected_length
+    assert results[0]["stdout"] == "hello\n"
+    assert results[1]["stdout"] is None
+    assert results[2]["stdout"] == "/tmp\n"
+    assert [entry["msg"] for entry in logger.log_book] == [
+        "Say hello.",
+        "Say goodbye.",
+        "Print the directory.",
+    ]
+
+
+@pytest.mark.skipif(psutil is None, reason="`psutil` is unavailable")
+def test_log_measure_min_duration() -> None:
+    """Ensure statistics are discarded for commands that finish quickly."""
+    logger = ShellLogger(stack()[0][3], log_dir=Path.cwd())
+    measure = ["cpu", "memory"]
+    logger.log("Quick command.", ":", measure=measure, measure_min_duration=5)
+    logger.log("Slow command.", "sleep 1", measure=measure, interval=0.1)
+    assert logger.log_book[0]["stats"] is None
+    assert logger.log_book[1]["stats"]["cpu"]
+
+
+def test_collector_registered_after_lookup(monkeypatch: MonkeyPatch) -> None:
+    """
+    Ensure a stats collector registered after a lookup is found.
+
+    Parameters:
+        monkeypatch:  The ``MonkeyPatch`` fixture.
+    """
+    monkeypatch.setattr(
+        StatsCollector, "subclasses", list(StatsCollector.subclasses)
+    )
+    assert collector_classes(("late",)) == ()
+
+    @StatsCollector.subclass
+    class LateStatsCollector(StatsCollector):
+        stat_name = "late"
+
+    assert collector_classes(("late",)) == (LateStatsCollector,)
+
+
+def test_log_exec(tmp_path: Path) -> None:
+    """
+    Ensure commands run directly, bypassing the shell, are logged.
+
+    Parameters:
+        tmp_path:  A temporary directory in which to run a command.
+    """
+    logger = ShellLogger(stack()[0][3], log_dir=Path.cwd())
+    result = logger.log_exec(
+        "Say hello.", ["echo", "hello world"], return_info=True
+    )
+    assert result["return_code"] == 0
+    assert result["stdout"] == "hello world\n"
+    assert logger.log_book[0]["cmd"] == "echo 'hello world'"
+    result = logger.log_exec(
+        "Print the directory.", ["pwd"], cwd=tmp_path, return_info=True
+    )
+    assert result["stdout"] == f"{tmp_path.resolve()}\n"
+    result = logger.log_batch([("Fail.", ["false"], {})])
+    assert result[0]["return_code"] == 1
+    with pytest.raises(TypeError, match="sequence of strings"):
+        logger.log_exec("Pass a string.", "echo hello")
+
+
+def test_log_exec_logs_inherited_environment(
+    monkeypatch: MonkeyPatch,
+) -> None:
+    """
+    Ensure the environment logged is the one the command ran with.
+
+    Parameters:
+        monkeypatch:  The ``MonkeyPatch`` fixture.
+    """
+    monkeypatch.setenv("FROM_PYTHON", "python")
+    monkeypatch.delenv("FROM_SHELL", raising=False)
+    logger = ShellLogger(stack()[0][3], log_dir=Path.cwd())
+    logger.log(
+        "Change the shell's state.", "export FROM_SHELL=shell; umask 077"
+    )
+    result = logger.log_exec(
+        "Print the environment and umask.",
+        ["sh", "-c", 'printf "%s,%s," "$FROM_PYTHON" "$FROM_SHELL"; umask'],
+        return_info=True,
+    )
+    from_python, from_shell, umask = result["stdout"].split(",")
+    assert from_python == "python"
+    assert from_shell == ""
+    entry = logger.log_book[-1]
+    assert "FROM_PYTHON=python\n" in entry["environment"]
+    assert "FROM_SHELL=" not in entry["environment"]
+    assert int(entry["umask"], 8) == int(umask, 8)
+    assert entry["ulimit"]
+
+
+@pytest.mark.skipif(psutil is None, reason="`psutil` is unavailable")
+def test_log_exec_missing_program(tmp_path: Path) -> None:
+    """
+    Ensure a program that can't be run is logged, and cleaned up after.
+
+    Parameters:
+        tmp_path:  A temporary directory in which to run the program.
+    """
+    logger = ShellLogger(stack()[0][3], log_dir=Path.cwd())
+    pwd = Path.cwd()
+    shell_pwd = logger.shell.pwd()
+    num_threads = threading.active_count()
+    command_not_found = 127
+    result = logger.log_exec(
+        "Run something that doesn't exist.",
+        ["no-such-program"],
+        cwd=tmp_path,
+        measure=["cpu"],
+        return_info=True,
+    )
+    assert result["return_code"] == command_not_found
+    assert "no-such-program" in result["stderr"]
+    assert logger.log_book[-1]["return_code"] == command_not_found
+    assert Path.cwd() == pwd
+    assert logger.shell.pwd() == shell_pwd
+    assert threading.active_count() == num_threads
+    logger.finalize()
+
+
+@pytest.mark.parametrize("stderr_length", range(12, 17))
+def test_tee_return_code_split_across_reads(
+    monkeypatch: MonkeyPatch, stderr_length: int
+) -> None:
+    """
+    Ensure the return code is found, however the reads split it.
+
+    The pipes are filled before they're read, such that each read is
+    as large as allowed, and the marker at the end of ``stderr`` falls
+    at every possible position relative to the end of the first read.
+    Nothing of the marker may be left behind to end the next command's
+    output early.
+
+    Parameters:
+        monkeypatch:  The ``MonkeyPatch`` fixture.
+        stderr_length:  How many bytes the command writes to ``stderr``.
+    """
+    monkeypatch.setattr("shell_logger.shell.READ_SIZE", 16)
+    stdout_rfd, stdout_wfd = os.pipe()
+    stderr_rfd, stderr_wfd = os.pipe()
+    commands = [(b"e" * stderr_length, b"12"), (b"next", b"0")]
+    stdout = os.fdopen(stdout_rfd, "rb", buffering=0)
+    stderr_file = os.fdopen(stderr_rfd, "rb", buffering=0)
+    with stdout, stderr_file:
+        for stderr, return_code in commands:
+            os.write(stdout_wfd, b"out\4")
+            os.write(stderr_wfd, stderr + b"\4" + return_code + b"\4")
+            output = Shell.tee(
+                stdout,
+                stderr_file,
+                stdout_str=True,
+                stderr_str=True,
+                quiet_stdout=True,
+                quiet_stderr=True,
+            )
+            assert output.stdout_str == "out"
+            assert output.stderr_str == stderr.decode()
+            assert output.return_code == return_code.decode()
+    os.close(stdout_wfd)
+    os.close(stderr_wfd)
+
+
+def test_live_output_split_across_reads(
+    capsys: CaptureFixture, monkeypatch: MonkeyPatch
+) -> None:
+    """
+    Ensure characters split across reads are printed to the console.
+
+    Parameters:
+        capsys:  A fixture for capturing the ``stdout``.
+        monkeypatch:  The ``MonkeyPatch`` fixture.
+    """
+    monkeypatch.setattr("shell_logger.shell.READ_SIZE", 3)
+    logger = ShellLogger(stack()[0][3], log_dir=Path.cwd())
+    logger.log_exec(
+        "Print multibyte characters.",
+        ["printf", "h\u00e9llo w\u00f6rld"],
+        live_stdout=True,
+    )
+    out, _ = capsys.readouterr()
+    assert out == "h\u00e9llo w\u00f6rld"
+
+
+def test_child_resolves_relative_paths() -> None:
+    """Ensure a child built directly with relative paths resolves them."""
+    parent = ShellLogger(stack()[0][3], log_dir=Path("log"))
+    child = ShellLogger(
+        "Child",
+        log_dir=Path("log"),
+        stream_dir=parent.stream_dir.relative_to(Path.cwd()),
+        html_file=parent.html_file.relative_to(Path.cwd()),
+        indent=1,
+    )
+    assert child.log_dir == parent.log_dir
+    assert child.stream_dir == parent.stream_dir
+    assert child.html_file == parent.html_file
+    assert child.log_dir.is_absolute()
+
+
+def test_change_log_dir() -> None:
+    """Ensure the log directory can be moved after finalizing."""
+    logger = ShellLogger(stack()[0][3], log_dir=Path.cwd() / "old")
+    logger.log("Say hello.", "echo hello")
+    child = logger.add_child("Child")
+    child.log("Say goodbye.", "echo goodbye")
+    logger.finalize()
+    new_log_dir = (Path.cwd() / "new").resolve()
+    logger.change_log_dir(new_log_dir)
+    assert not (Path.cwd() / "old").exists()
+    assert logger.log_dir == new_log_dir
+    assert logger.stream_dir.parent == new_log_dir
+    assert logger.html_file.exists()
+    assert child.log_dir == new_log_dir
+    assert child.stream_dir == logger.stream_dir
+    assert child.html_file == logger.html_file
+    html_link = new_log_dir / logger.html_file.name
+    assert html_link.resolve() == logger.html_file
+
+
+@pytest.mark.parametrize(
+    ("fmt", "expected"),
+    [
+        ("{hrs}h {min}m {sec}s", "1h 2m 5.46s"),
+        ("{days}d {hrs}:{min}:{sec}", "2d 1:2:5.46"),
+    ],
+)
+def test_strfdelta(fmt: str, expected: str) -> None:
+    """Ensure time deltas are formatted correctly."""
+    delta = timedelta(days=2, seconds=3725, microseconds=456000)
+    assert ShellLogger.strfdelta(delta, fmt) == expected
+
+
+def test_decoder_reads_legacy_datetime_format() -> None:
+    """Ensure dates and times saved by older versions can be loaded."""
+    legacy = json.dumps(
+        {
+            "__type__": "datetime",
+            "value": "2023-04-05_06:07:08:090000",
+            "format": "%Y-%m-%d_%H:%M:%S:%f",
+        }
+    )
+    assert json.loads(legacy, cls=ShellLoggerDecoder) == datetime(
+        2023, 4, 5, 6, 7, 8, 90000
+    )
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+@pytest.mark.parametrize("pretty_json", [True, False])
+def test_finalize_pretty_json(
+    monkeypatch: MonkeyPatch,
+    use_orjson: bool,  # noqa: FBT001
+    pretty_json: bool,  # noqa: FBT001
+) -> None:
+    """Ensure the JSON file is only indented when asked for."""
+    if use_orjson:
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr("shell_logger.shell_logger.orjson", None)
+    logger = ShellLogger(stack()[0][3], log_dir=Path.cwd())
+    logger.log("Say hello.", "echo hello")
+    logger.finalize(pretty_json=pretty_json)
+    json_file = logger.stream_dir / f"{logger.name}.json"
+    text = json_file.read_text()
+    assert ("\n" in text.strip()) == pretty_json
+    if pretty_json:
+        assert re.match(r'\{\n  "', text)
+    with json_file.open("r") as jf:
+        loaded_logger = json.load(jf, cls=ShellLoggerDecoder)
+    assert loaded_logger.log_book[0] == logger.log_book[0]
+
+
+@pytest.mark.parametrize("num_points", [0, 10, 1000, 1001, 12345])
+def test_chart_series_is_downsampled(num_points: int) -> None:
+    """Ensure charts embed no more than the maximum number of points."""
+    data = [(1_700_000_000_000 + i, float(i % 100)) for i in range(num_points)]
+    labels, values = chart_series(data)
+    assert len(labels) == len(values) <= MAX_CHART_POINTS
+    if num_points <= MAX_CHART_POINTS:
+        assert len(values) == num_points
+    else:
+        assert len(values) > MAX_CHART_POINTS // 2
+    assert values[:1] == [y for _, y in data[:1]]
+
+
+@pytest.mark.parametrize(
+    "milliseconds", [0, 1_700_000_000_000, 1_700_000_000_123]
+)
+def test_get_human_time(milliseconds: int) -> None:
+    """Ensure chart labels show the date and time to the microsecond."""
+    expected = datetime.fromtimestamp(milliseconds / 1000.0).strftime(
+        "%Y-%m-%d %H:%M:%S.%f"
+    )
+    assert get_human_time(milliseconds) == expected
+
+
+def test_encoder_subclass_overrides_are_used() -> None:
+    """Ensure an encoder subclass's own encoders aren't shadowed."""
+
+    class RelativePathEncoder(ShellLoggerEncoder):
+        def _encode_path(self, obj: Path) -> dict:
+            return {"__type__": "Path", "value": obj.name}
+
+    path = Path("/some/where")
+    assert json.loads(json.dumps(path, cls=ShellLoggerEncoder)) == {
+        "__type__": "Path",
+        "value": "/some/where",
+    }
+    assert json.loads(json.dumps(path, cls=RelativePathEncoder)) == {
+        "__type__": "Path",
+        "value": "where",
+    }
+    assert json.loads(json.dumps(path, cls=ShellLoggerEncoder)) == {
+        "__type__": "Path",
+        "value": "/some/where",
+    }